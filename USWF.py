@@ -1,12 +1,5 @@
 import streamlit as st
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
-from tvDatafeed import TvDatafeed, Interval
 import hashlib
-import numpy as np
-import time
 
 # =====================================================
 # LOGIN
@@ -31,6 +24,18 @@ if not st.session_state.authenticated:
             st.error("Invalid credentials")
     st.stop()
 
+# =====================================================
+# IMPORTS (AFTER LOGIN – the login screen only loads streamlit)
+# =====================================================
+import pandas as pd
+
+from usaweather import alignment, diagnostics, forecast_cache, metrics, tradingview
+from usaweather.demand import hourly_frame
+from usaweather.incremental import tracker
+from usaweather.locations import TOP5_STATES as US_STATES
+from usaweather.markets import fetch_ng_daily_history
+from usaweather.refresher import REFRESHER
+
 # =====================================================
 # CONFIG
 # =====================================================
@@ -39,6 +44,7 @@ st.set_page_config(
     layout="wide",
     page_icon="🔥"
 )
+PAGE_START = diagnostics.page_timer()
 col_logo, col_ticker = st.columns([0.22, 0.78]) 
 with col_logo: 
     st.image("Assets/sgy1.png", width=220)
@@ -52,8 +58,8 @@ c1, c2, c3 = st.columns([1.2, 1.8, 6])
 
 with c1:
     if st.button("🔄 Refresh Now"):
-        st.session_state["last_refresh"] = time.time()
-        st.cache_data.clear()
+        forecast_cache.expire_all()
+        REFRESHER.refresh_now(timeout=60)
         st.rerun()
 
 with c2:
@@ -62,90 +68,42 @@ with c2:
 with c3:
     st.caption("Manual refresh forces fresh NOAA weather + NG demand recalculation")
 
-
 # =====================================================
-# AUTO REFRESH ENGINE (SAFE & TIMED)
-# =====================================================
-# =====================================================
-# AUTO REFRESH TIMER (NO LIBRARY, NO LOOP)
-# =====================================================
-if auto_refresh:
-    now = time.time()
-    last = st.session_state.get("last_refresh", 0)
-
-    if now - last >= 5 * 60:  # 30 minutes
-        st.session_state["last_refresh"] = now
-        st.cache_data.clear()
-        st.rerun()
-
-
-
-HEADERS = {"User-Agent": "ng-weather-dashboard"}
-
-# =====================================================
-# STATES (Population Weighted)
+# FORECAST DEMAND (RAW)
 # =====================================================
-US_STATES = {
-    "Texas": ("Austin", 30.2672, -97.7431, 29.1),
-    "California": ("Sacramento", 38.5816, -121.4944, 39.0),
-    "Florida": ("Tallahassee", 30.4383, -84.2807, 22.6),
-    "New York": ("Albany", 42.6526, -73.7562, 19.6),
-    "Pennsylvania": ("Harrisburg", 40.2732, -76.8867, 12.9),
-}
+REFRESHER.register("noaa:top5", tracker("top5", US_STATES).refresh)
+REFRESHER.register("tv:ng_daily90", lambda: fetch_ng_daily_history(tradingview.client()))
 
-# =====================================================
-# WEATHER FUNCTIONS
-# =====================================================
-def f_to_c(f):
-    return (f - 32) * 5 / 9
-
-def get_hourly_forecast(lat, lon):
-    r = requests.get(f"https://api.weather.gov/points/{lat},{lon}", headers=HEADERS)
-    if r.status_code != 200:
-        return []
-    hourly_url = r.json()["properties"]["forecastHourly"]
-    h = requests.get(hourly_url, headers=HEADERS)
-    if h.status_code != 200:
-        return []
-    return h.json()["properties"]["periods"][:48]
-
-def calc_ng_demand(temp_c):
-    hdd = max(18 - temp_c, 0)
-    cdd = max(temp_c - 22, 0)
-    return hdd * 1.3 + cdd * 0.7
+# ⏱ rerun as soon as the background refresher publishes newer weather
+if auto_refresh:
+    diagnostics.auto_refresh("noaa:top5")
 
-# =====================================================
-# FORECAST DEMAND (RAW)
-# =====================================================
-rows = []
+snap = REFRESHER.snapshot("noaa:top5", "tv:ng_daily90")
+tracked = diagnostics.require_weather(snap, "noaa:top5")
 
-for state, (_, lat, lon, pop) in US_STATES.items():
-    forecast = get_hourly_forecast(lat, lon)
-    for h in forecast:
-        rows.append({
-            "DateTime": h.get("startTime"),
-            "Demand": calc_ng_demand(f_to_c(h["temperature"])) * pop
-        })
+demand = tracked.demand
 
-df = pd.DataFrame(rows)
+hourly = hourly_frame(demand)
 
 # =====================================================
-# 🔥 ABSOLUTE SAFE DATE CONVERSION (NO .dt ANYWHERE)
+# DAILY DEMAND + PRICE ON ONE (US EASTERN) CALENDAR
 # =====================================================
-df["Date"] = df["DateTime"].apply(
-    lambda x: pd.to_datetime(x, errors="coerce").date()
-    if pd.notna(x) else None
-)
+price = snap.data["tv:ng_daily90"]
 
-df = df.dropna(subset=["Date"])
+if price is None or price.empty:
+    st.error("NG price history unavailable")
+    st.stop()
 
-# =====================================================
-# DAILY DEMAND
-# =====================================================
-df_daily = (
-    df.groupby("Date", as_index=False)["Demand"]
-      .sum()
-)
+with metrics.span("aggregate.pandas"):
+    daily = alignment.align(
+        alignment.series(hourly["Weighted_Demand"], hourly["Time"], name="Demand"),
+        # daily bars are stamped with their session date
+        alignment.series(price["close"], price.index, name="Price"),
+        calendar="daily"
+    )
+    forecast = daily["Demand"].dropna()
+    df_daily = pd.DataFrame({"Date": forecast.index.date, "Demand": forecast.to_numpy()})
+    df_price = pd.DataFrame({"Date": daily.index.date, "Price": daily["Price"].to_numpy()}).dropna()
 
 # =====================================================
 # BIAS CALCULATION
@@ -171,68 +129,39 @@ else:
     color = "#e74c3c"
 
 # =====================================================
-# PRICE DATA (DAILY – GAP FREE)
-# =====================================================
-tv = TvDatafeed()
-price = tv.get_hist(
-    symbol="NATURALGAS",
-    exchange="CAPITALCOM",
-    interval=Interval.in_daily,
-    n_bars=90
-)
-
-price = price.reset_index()[["datetime", "close"]]
-price.rename(columns={"datetime": "Date", "close": "Price"}, inplace=True)
-
-price["Date"] = price["Date"].apply(
-    lambda x: pd.to_datetime(x, errors="coerce").date()
-)
-
-all_days = pd.date_range(min(price["Date"]), max(price["Date"]), freq="D")
-
-price = (
-    price.set_index("Date")
-         .reindex(all_days)
-         .rename_axis("Date")
-         .reset_index()
-)
-
-price["Price"] = price["Price"].ffill()
-
-# =====================================================
-# MAIN CHART (WITH FUTURE GAP)
+# MAIN CHART (HISTORY → FORECAST)
 # =====================================================
 st.subheader("📈 Natural Gas Demand vs Price")
+diagnostics.age_caption(snap, "noaa:top5")
 
-gap_days = 2
-last_hist_date = price["Date"].max()
+# plot on naive Eastern dates so matplotlib doesn't shift them to UTC
+dates = daily.index.tz_localize(None)
 
-future_dates = [
-    last_hist_date + timedelta(days=gap_days + i)
-    for i in range(len(df_daily))
-]
+with metrics.span("render.matplotlib"):
+    # first use – the data above renders before matplotlib loads
+    import matplotlib.pyplot as plt
 
-fig, ax1 = plt.subplots(figsize=(14, 6))
+    fig, ax1 = plt.subplots(figsize=(14, 6))
 
-ax1.plot(
-    future_dates,
-    df_daily["Demand"],
-    linestyle="--",
-    linewidth=2,
-    label="NG Demand (Forecast)"
-)
+    ax1.plot(
+        dates,
+        daily["Demand"],
+        linestyle="--",
+        linewidth=2,
+        label="NG Demand (Forecast)"
+    )
 
-ax1.set_ylabel("Population Weighted Demand")
-ax1.grid(alpha=0.3)
+    ax1.set_ylabel("Population Weighted Demand")
+    ax1.grid(alpha=0.3)
 
-ax2 = ax1.twinx()
-ax2.plot(price["Date"], price["Price"], color="black", linewidth=2, label="NG Price")
-ax2.set_ylabel("NG Price")
+    ax2 = ax1.twinx()
+    ax2.plot(dates, daily["Price"], color="black", linewidth=2, label="NG Price")
+    ax2.set_ylabel("NG Price")
 
-fig.legend(loc="upper left")
-plt.xticks(rotation=45)
+    fig.legend(loc="upper left")
+    plt.xticks(rotation=45)
 
-st.pyplot(fig)
+    st.pyplot(fig)
 
 # =====================================================
 # BIAS DISPLAY
@@ -271,39 +200,45 @@ remaining_strength = 100 - bias_strength
 # =====================================================
 st.subheader("📊 Demand & Bias Snapshot")
 
-c1, c2 = st.columns(2)
-
-with c1:
-    fig1, ax = plt.subplots()
-    ax.pie(
-        [bias_strength, remaining_strength],
-        labels=["Bias Strength", "Remaining"],
-        colors=[color, "#ecf0f1"],
-        startangle=90,
-        wedgeprops=dict(width=0.4)
-    )
-
-    ax.set_title("Bias Strength")
-    st.pyplot(fig1)
-
-with c2:
-    fig2, ax = plt.subplots()
-    ax.pie(
-        df_daily["Demand"],
-        labels=df_daily["Date"],
-        autopct="%1.1f%%",
-        startangle=90
-    )
-    ax.set_title("Forecast Demand Distribution")
-    st.pyplot(fig2)
+with metrics.span("render.matplotlib"):
+    c1, c2 = st.columns(2)
+
+    with c1:
+        fig1, ax = plt.subplots()
+        ax.pie(
+            [bias_strength, remaining_strength],
+            labels=["Bias Strength", "Remaining"],
+            colors=[color, "#ecf0f1"],
+            startangle=90,
+            wedgeprops=dict(width=0.4)
+        )
+
+        ax.set_title("Bias Strength")
+        st.pyplot(fig1)
+
+    with c2:
+        fig2, ax = plt.subplots()
+        ax.pie(
+            df_daily["Demand"],
+            labels=df_daily["Date"],
+            autopct="%1.1f%%",
+            startangle=90
+        )
+        ax.set_title("Forecast Demand Distribution")
+        st.pyplot(fig2)
 
 # =====================================================
 # TABLE
 # =====================================================
 st.subheader("📋 Gap-Free Daily Price")
-st.dataframe(price.tail(30), use_container_width=True)
+st.dataframe(df_price.tail(30), use_container_width=True)
 
 
+# =====================================================
+# DIAGNOSTICS
+# =====================================================
+diagnostics.panel("uswf", PAGE_START)
+
 st.markdown("""
 ---
 **Designed by:-  
@@ -0,0 +1,327 @@
+# =====================================================
+# END-TO-END DASHBOARD BENCHMARK
+# runs the Streamlit pages headlessly (AppTest, stubbed
+# st.secrets / login) against replayed upstream fixtures
+# and reports per-stage wall time, peak RSS and upstream
+# call counts. Every case runs in a fresh subprocess so
+# caches start cold and RSS is per case.
+#
+#   python benchmarks/bench_dashboards.py                 # synthetic fixtures, full matrix
+#   python benchmarks/bench_dashboards.py --fixtures DIR  # fixtures recorded with
+#                                                         # USAWEATHER_HTTP_MODE=record
+#   python benchmarks/bench_dashboards.py --json results/$(git rev-parse --short HEAD).json
+#
+# axes: --locations (USV2 high-res point count), --horizons
+# (hourly periods per NOAA grid), --sessions (concurrent
+# page runs sharing one process)
+# =====================================================
+import argparse
+import ast
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+SCRIPTS = ["All5.py", "USAW.py", "USV1.py", "USV2.py", "USV3.py", "USWF.py"]
+STAGES = ("fetch", "parse", "aggregate")
+TIMEOUT = 600
+
+
+# -----------------------------------------------------
+# synthetic fixtures
+# -----------------------------------------------------
+def script_locations(script):
+    # the pages import their location table from usaweather.locations
+    from usaweather import locations
+
+    src = open(os.path.join(REPO, script), encoding="utf-8").read()
+    for node in ast.parse(src).body:
+        if isinstance(node, ast.ImportFrom) and node.module == "usaweather.locations":
+            for alias in node.names:
+                if (alias.asname or alias.name) == "US_STATES":
+                    return getattr(locations, alias.name)
+    # or through the shared 50-state refresher job
+    return locations.US_STATES if "jobs.us50" in src else {}
+
+
+def make_points_table(n, path, rng):
+    from usaweather.locations import METRO_TABLE, load_points
+
+    base = list(load_points(METRO_TABLE).values())
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("name,state,lat,lon,population\n")
+        for i in range(n):
+            state, lat, lon, pop = base[i % len(base)]
+            f.write(f"p{i},{state},{lat + rng.normal(0, 0.5):.4f},{lon + rng.normal(0, 0.5):.4f},"
+                    f"{pop / (1 + i // len(base)):.4f}\n")
+
+
+def hourly_periods(rng, hours):
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    phase = rng.uniform(0, 2 * np.pi)
+    level = rng.uniform(35, 70)
+    return [
+        {
+            "number": h + 1,
+            "startTime": (start + timedelta(hours=h)).isoformat(),
+            "endTime": (start + timedelta(hours=h + 1)).isoformat(),
+            "temperature": int(level + 12 * np.sin(2 * np.pi * h / 24 + phase)),
+            "temperatureUnit": "F",
+            "shortForecast": "Partly Cloudy",
+        }
+        for h in range(hours)
+    ]
+
+
+def synthesize(fixture_dir, locations, hours, rng):
+    import pandas as pd
+
+    from usaweather import replay
+    from usaweather.markets import DHAN_NG_URL
+    from usaweather.news import NG_NEWS_URL
+
+    replay.FIXTURE_DIR = fixture_dir
+    cache = {"Cache-Control": "max-age=3600"}
+
+    for i, (lat, lon) in enumerate(sorted(locations)):
+        grid = f"https://api.weather.gov/gridpoints/SYN/{i},1/forecast/hourly"
+        replay.save_response("GET", f"https://api.weather.gov/points/{lat},{lon}", json.dumps(
+            {"properties": {"gridId": "SYN", "gridX": i, "gridY": 1, "forecastHourly": grid}}
+        ).encode(), headers=cache)
+        replay.save_response("GET", grid, json.dumps(
+            {"properties": {"updateTime": "2026-01-01T00:00:00+00:00", "periods": hourly_periods(rng, hours)}}
+        ).encode(), headers=cache)
+
+    rows = "".join(
+        f"<tr><td>NATURALGAS {m}</td><td>{10 + 30 * k}</td><td>{250 + k:.2f}</td><td>1.20</td>"
+        f"<td>0.48%</td><td>{12000 - 900 * k}</td><td>{30000 - 2000 * k}</td><td>2.10%</td></tr>"
+        for k, m in enumerate(["JAN", "FEB", "MAR", "APR"])
+    )
+    replay.save_response("GET", DHAN_NG_URL, (
+        '<html><body><span class="lpu38Head">₹250.00</span><table>'
+        "<tr><th>Contract</th></tr>" + rows + "</table></body></html>"
+    ).encode(), headers={"Content-Type": "text/html; charset=utf-8"})
+
+    items = "".join(
+        f"<item><title>Natural gas headline {k}</title>"
+        f"<pubDate>Mon, 0{k + 1} Jan 2026 12:00:00 GMT</pubDate></item>"
+        for k in range(8)
+    )
+    replay.save_response("GET", NG_NEWS_URL, (
+        '<?xml version="1.0"?><rss version="2.0"><channel><title>ng</title>' + items + "</channel></rss>"
+    ).encode(), headers={"Content-Type": "application/rss+xml"})
+
+    for n_bars in (1, 90):
+        idx = pd.date_range(end=pd.Timestamp.now().normalize(), periods=n_bars, freq="D", name="datetime")
+        close = 3.0 + np.cumsum(rng.normal(0, 0.05, n_bars))
+        replay.save_call(f"tv:NATURALGAS:CAPITALCOM:1D:{n_bars}", pd.DataFrame({
+            "symbol": "CAPITALCOM:NATURALGAS", "open": close, "high": close + 0.05,
+            "low": close - 0.05, "close": close, "volume": 1000.0,
+        }, index=idx))
+
+
+# -----------------------------------------------------
+# child: one case in a fresh interpreter
+# -----------------------------------------------------
+def run_page(script, hires):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(REPO, script), default_timeout=TIMEOUT)
+    at.secrets["users"] = {"bench": "x"}
+    at.session_state["authenticated"] = True
+    if hires:
+        at.session_state["hi_res"] = True
+
+    t0 = time.perf_counter()
+    at.run()
+    wall = time.perf_counter() - t0
+
+    # a page that stops on st.error (e.g. "data unavailable") failed too
+    errors = [str(e.value) for e in at.exception] + [str(e.value) for e in at.error]
+    return wall, errors
+
+
+def stage_times(snap, walls):
+    # fetch / parse / aggregate run on refresher threads and are summed
+    # across workers; render is a page's wall time minus its snapshot wait
+    timings = snap["timings"]
+    out = {s: round(sum(v["total_s"] for k, v in timings.items() if k.split(".")[0] == s) * 1000, 2)
+           for s in STAGES}
+    wait = timings.get("wait.snapshot", {"count": 1, "total_s": 0.0})
+    out["render"] = round(max(0.0, np.mean(walls) - wait["total_s"] / wait["count"]) * 1000, 2)
+    return out
+
+
+def child(args):
+    # pages load Assets/ relative to cwd and USAW.py writes its Excel export there
+    with tempfile.TemporaryDirectory(prefix="usaw-bench-") as workdir:
+        os.symlink(os.path.join(REPO, "Assets"), os.path.join(workdir, "Assets"))
+        os.chdir(workdir)
+        try:
+            result = measure(args)
+        finally:
+            os.chdir(REPO)
+    print(json.dumps(result))
+
+
+def measure(args):
+    from usaweather import metrics
+
+    hires = args.locations > 0
+    result = {"script": args.child, "locations": args.locations or None,
+              "horizon": args.horizon, "sessions": args.sessions}
+
+    for phase in ("cold", "warm"):
+        metrics.reset()
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            runs = list(pool.map(lambda _: run_page(args.child, hires), range(args.sessions)))
+        total = time.perf_counter() - t0
+
+        walls = [w for w, _ in runs]
+        snap = metrics.snapshot()
+        result[phase] = {
+            "wall_ms": round(total * 1000, 2),
+            "session_ms_mean": round(float(np.mean(walls)) * 1000, 2),
+            "session_ms_max": round(max(walls) * 1000, 2),
+            "stages_ms": stage_times(snap, walls),
+            "upstream_calls": {k.split(".", 1)[1]: v for k, v in snap["counters"].items()
+                               if k.startswith("upstream.")},
+        }
+        result.setdefault("errors", []).extend(e for _, errs in runs for e in errs)
+
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+# -----------------------------------------------------
+# parent: build fixtures, fan out cases
+# -----------------------------------------------------
+def spawn(script, fixture_dir, locations=0, horizon=None, sessions=1, points_table=None):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", script,
+           "--locations", str(locations), "--sessions", str(sessions)]
+    if horizon:
+        cmd += ["--horizon", str(horizon)]
+    with tempfile.TemporaryDirectory(prefix="usaw-cache-") as cache_dir:
+        env = dict(os.environ,
+                   USAWEATHER_HTTP_MODE="replay",
+                   USAWEATHER_FIXTURES=fixture_dir,
+                   USAWEATHER_CACHE_DIR=cache_dir)
+        if points_table:
+            env["USAWEATHER_POINTS_TABLE"] = points_table
+        out = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=TIMEOUT)
+    if out.returncode != 0:
+        return {"script": script, "locations": locations or None, "horizon": horizon,
+                "sessions": sessions, "errors": out.stderr.strip().splitlines()[-1:] or ["exit status %d" % out.returncode]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def cases(args):
+    state_locations = set()
+    for script in SCRIPTS:
+        state_locations |= {(v[1], v[2]) for v in script_locations(script).values()}
+
+    if args.fixtures:
+        for script in args.scripts:
+            for s in args.sessions:
+                yield spawn(script, args.fixtures, sessions=s)
+        return
+
+    rng = np.random.default_rng(42)
+    # fixtures are shared by every case and removed once the last has run
+    with tempfile.TemporaryDirectory(prefix="usaw-fixtures-") as root:
+        def fixtures(hours, points_table=None):
+            d = os.path.join(root, f"h{hours}-{os.path.basename(points_table or 'states')}")
+            if not os.path.isdir(d):
+                locations = set(state_locations)
+                if points_table:
+                    from usaweather.locations import load_points
+                    locations |= {(v[1], v[2]) for v in load_points(points_table).values()}
+                synthesize(d, locations, hours, rng)
+            return d
+
+        base = max(args.horizons)
+
+        # every page at the default shape
+        for script in args.scripts:
+            yield spawn(script, fixtures(base), horizon=base)
+
+        # forecast horizon
+        for hours in args.horizons:
+            if hours != base:
+                yield spawn("USV1.py", fixtures(hours), horizon=hours)
+
+        # concurrent sessions in one process
+        for s in args.sessions:
+            if s != 1:
+                yield spawn("USV1.py", fixtures(base), horizon=base, sessions=s)
+
+        # number of locations (USV2 high-resolution mode)
+        for n in args.locations:
+            table = os.path.join(root, f"points{n}.csv")
+            make_points_table(n, table, rng)
+            yield spawn("USV2.py", fixtures(base, table), locations=n, horizon=base, points_table=table)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    ap.add_argument("--locations", type=int, nargs="+", default=[120, 500, 1000])
+    ap.add_argument("--horizons", type=int, nargs="+", default=[48, 96, 156])
+    ap.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--fixtures", help="replay recorded fixtures from this directory")
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--horizon", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        args.locations = args.locations[0]
+        args.sessions = args.sessions[0]
+        return child(args)
+
+    results, failed = [], 0
+    print("script | locations | horizon | sessions | cold_ms | warm_ms | fetch | parse | aggregate | render | rss_mb | calls")
+    for r in cases(args):
+        results.append(r)
+        if r.get("errors") or "cold" not in r:
+            # a page that raised still has timings – they measure the error path
+            failed += 1
+            print(" | ".join(str(r.get(k)) for k in ("script", "locations", "horizon", "sessions")),
+                  "| FAILED", r.get("errors"))
+            continue
+        c = r["cold"]
+        print(" | ".join(str(x) for x in (
+            r["script"], r["locations"], r["horizon"], r["sessions"], c["wall_ms"], r["warm"]["wall_ms"],
+            *(c["stages_ms"][s] for s in (*STAGES, "render")), r["peak_rss_mb"],
+            sum(c["upstream_calls"].values()),
+        )))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                                         capture_output=True, text=True).stdout.strip(),
+                "python": platform.python_version(),
+                "taken_at": datetime.now(timezone.utc).isoformat(),
+                "results": results,
+            }, f, indent=2)
+
+    if failed:
+        print(f"{failed} case(s) FAILED", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# =====================================================
+# HIGH-RESOLUTION MODE BENCHMARK
+# refresh time + memory at 500 / 1,000 / 3,000 points:
+#   fetch     – noaa.fetch_all_hourly through the scheduler
+#               on replayed fixtures, cold (points + forecast
+#               per point) and a refresh (one forecast each)
+#   aggregate – ingestion and population-weighted aggregation
+# Replay lifts the rate limits, so each case also reports
+# the floor the live api.weather.gov limit puts on a refresh
+# and whether that fits the refresher's interval. The
+# shipped metro table is ~120 points.
+#
+#   python benchmarks/bench_highres.py [--points 500 1000 3000] [--latency 0.1] [--json out.json]
+# =====================================================
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# fixtures and caches live in a throwaway directory; both are read at import
+_TMP = tempfile.TemporaryDirectory(prefix="usaw-highres-")
+os.environ["USAWEATHER_HTTP_MODE"] = "replay"
+os.environ["USAWEATHER_FIXTURES"] = os.path.join(_TMP.name, "fixtures")
+os.environ["USAWEATHER_CACHE_DIR"] = os.path.join(_TMP.name, "cache")
+
+from usaweather import forecast_cache, replay  # noqa: E402
+from usaweather.incremental import GridTracker  # noqa: E402
+from usaweather.locations import load_points  # noqa: E402
+from usaweather.noaa import HOURS, Periods, fetch_all_hourly  # noqa: E402
+from usaweather.refresher import REFRESH_INTERVAL  # noqa: E402
+from usaweather.scheduler import LIVE_HOST_LIMITS, SCHEDULER  # noqa: E402
+
+NOAA_RATE = LIVE_HOST_LIMITS["api.weather.gov"][0]  # requests / s, live
+
+CHANGED_SHARE = 0.05  # grids updated between two refreshes
+
+
+def make_points(n, rng):
+    base = list(load_points().values())
+    points = {}
+    for i in range(n):
+        state, lat, lon, pop = base[i % len(base)]
+        points[f"p{i}"] = (
+            state,
+            lat + rng.normal(0, 0.5),
+            lon + rng.normal(0, 0.5),
+            pop / (1 + i // len(base)),
+        )
+    return points
+
+
+def make_periods(rng, version, hours=HOURS):
+    start = datetime(2026, 1, 5, tzinfo=timezone(timedelta(hours=-5)))
+    temps = rng.integers(-10, 100, size=hours)
+    periods = Periods(
+        {
+            "startTime": (start + timedelta(hours=h)).isoformat(),
+            "temperature": int(temps[h]),
+            "shortForecast": "Sunny",
+        }
+        for h in range(hours)
+    )
+    periods.update_time = version
+    return periods
+
+
+def write_fixtures(points, grid_id, rng, hours=HOURS):
+    # one /points and one forecastHourly response per point; a grid id per
+    # case keeps forecast URLs (the cache key) distinct between cases
+    cache = {"Cache-Control": "max-age=3600"}
+    start = datetime(2026, 1, 5, tzinfo=timezone(timedelta(hours=-5)))
+    for i, (_, lat, lon, _) in enumerate(points.values()):
+        grid = f"https://api.weather.gov/gridpoints/{grid_id}/{i},1/forecast/hourly"
+        replay.save_response("GET", f"https://api.weather.gov/points/{lat},{lon}", json.dumps(
+            {"properties": {"gridId": grid_id, "gridX": i, "gridY": 1, "forecastHourly": grid}}
+        ).encode(), headers=cache)
+        temps = rng.integers(-10, 100, size=hours)
+        replay.save_response("GET", grid, json.dumps({"properties": {
+            "updateTime": "2026-01-05T00:00:00+00:00",
+            "periods": [
+                {"startTime": (start + timedelta(hours=h)).isoformat(),
+                 "temperature": int(temps[h]), "shortForecast": "Sunny"}
+                for h in range(hours)
+            ],
+        }}).encode(), headers=cache)
+
+
+def fetched(points):
+    before = SCHEDULER.stats().get("requests", 0)
+    forecasts, ms = timed(fetch_all_hourly, points)
+    calls = SCHEDULER.stats().get("requests", 0) - before
+    return forecasts, ms, calls
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def run(n, rng):
+    points = make_points(n, rng)
+    write_fixtures(points, f"HR{n}", rng)
+
+    # fetch: a cold start resolves every point, a refresh re-requests
+    # every (expired) forecast
+    _, fetch_cold_ms, cold_calls = fetched(points)
+    forecast_cache.expire_all()
+    _, fetch_refresh_ms, refresh_calls = fetched(points)
+    refresh_floor_s = refresh_calls / NOAA_RATE
+
+    forecasts = {name: make_periods(rng, "v1") for name in points}
+
+    # memory on its own pass – tracemalloc slows allocation-heavy code
+    tracemalloc.start()
+    GridTracker(points).apply(forecasts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracker = GridTracker(points)
+    _, cold_ms = timed(tracker.apply, forecasts)
+
+    _, unchanged_ms = timed(tracker.apply, forecasts)
+
+    changed = rng.choice(list(points), size=max(1, int(n * CHANGED_SHARE)), replace=False)
+    updated = dict(forecasts)
+    for name in changed:
+        updated[name] = make_periods(rng, "v2")
+    _, incremental_ms = timed(tracker.apply, updated)
+
+    return {
+        "points": n,
+        "hours": HOURS,
+        "fetch_cold_ms": round(fetch_cold_ms, 2),
+        "cold_calls": cold_calls,
+        "fetch_refresh_ms": round(fetch_refresh_ms, 2),
+        "refresh_calls": refresh_calls,
+        "live_cold_floor_s": round(cold_calls / NOAA_RATE, 1),
+        "live_refresh_floor_s": round(refresh_floor_s, 1),
+        "fits_refresh_interval": max(refresh_floor_s, fetch_refresh_ms / 1000) < REFRESH_INTERVAL,
+        "aggregate_cold_ms": round(cold_ms, 2),
+        "aggregate_unchanged_ms": round(unchanged_ms, 2),
+        "aggregate_incremental_ms": round(incremental_ms, 2),
+        "changed_points": len(changed),
+        "peak_memory_mb": round(peak / 2**20, 2),
+        "matrix_mb": round(tracker._temps.nbytes / 2**20, 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--points", type=int, nargs="+", default=[500, 1000, 3000])
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per replayed NOAA call")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+    replay.LATENCY = args.latency
+
+    rng = np.random.default_rng(42)
+    results = [run(n, rng) for n in args.points]
+
+    cols = list(results[0])
+    print(" | ".join(cols))
+    for r in results:
+        print(" | ".join(str(r[c]) for c in cols))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# =====================================================
+# IMPORT-TIME BENCHMARK
+# what a cold process pays for imports before anything
+# renders: each page's pre-login imports (the login
+# screen) vs. all of its imports (the dashboard), plus
+# the headless CLI. Runs `python -X importtime` in fresh
+# subprocesses and summarises the heaviest top-level
+# packages.
+#
+#   python benchmarks/bench_imports.py [--scripts USV1.py ...] [--repeat 5] [--top 8]
+#   python benchmarks/bench_imports.py --json results/imports-$(git rev-parse --short HEAD).json
+# =====================================================
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = ["All5.py", "USAW.py", "USV1.py", "USV2.py", "USV3.py", "USWF.py"]
+CLI_IMPORTS = "import usaweather.cli\nimport usaweather.incremental"
+
+
+def _is_login_gate(node):
+    return isinstance(node, ast.If) and "authenticated" in ast.unparse(node.test)
+
+
+def _module_imports(nodes):
+    # imports a script run executes – including ones deferred into
+    # with/if blocks, but not those inside function bodies
+    for node in nodes:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            yield from _module_imports(ast.iter_child_nodes(node))
+
+
+def script_imports(script):
+    """(imports run before the login gate, every import the page runs)"""
+    src = open(os.path.join(REPO, script), encoding="utf-8").read()
+    login, page, gated = [], [], False
+    for node in ast.parse(src).body:
+        if _is_login_gate(node):
+            gated = True
+        for imp in _module_imports([node]):
+            code = ast.unparse(imp)
+            page.append(code)
+            if not gated:
+                login.append(code)
+    return "\n".join(login), "\n".join(page)
+
+
+def importtime(code):
+    """{module: (self_us, cumulative_us, depth)} for one cold interpreter"""
+    env = dict(os.environ, PYTHONPATH=REPO + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO, env=env, capture_output=True, text=True
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(own), int(cumulative), depth)
+    return modules
+
+
+def summarize(code, repeat, top):
+    # fastest of `repeat` runs – the others mostly measure disk cache noise
+    best = None
+    for _ in range(repeat):
+        modules = importtime(code)
+        total = sum(c for _, c, d in modules.values() if d == 0)
+        if best is None or total < best[0]:
+            best = (total, modules)
+
+    total, modules = best
+    roots = {}
+    for name, (_, cumulative, depth) in modules.items():
+        if depth == 0:
+            root = name.split(".")[0]
+            roots[root] = roots.get(root, 0) + cumulative
+    heaviest = sorted(roots.items(), key=lambda kv: -kv[1])[:top]
+    return {
+        "total_ms": round(total / 1000, 1),
+        "modules": len(modules),
+        "top_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--top", type=int, default=6)
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+
+    targets = []
+    for script in args.scripts:
+        login, page = script_imports(script)
+        targets += [(script, "login", login), (script, "page", page)]
+    targets.append(("python -m usaweather", "cli", CLI_IMPORTS))
+
+    results = []
+    print("target | phase | total_ms | modules | heaviest (cumulative ms)")
+    for target, phase, code in targets:
+        try:
+            r = dict(target=target, phase=phase, **summarize(code, args.repeat, args.top))
+        except RuntimeError as e:
+            print(target, phase, "FAILED", e)
+            results.append({"target": target, "phase": phase, "error": str(e)})
+            continue
+        results.append(r)
+        print(" | ".join(str(x) for x in (
+            target, phase, r["total_ms"], r["modules"],
+            ", ".join(f"{k} {v}" for k, v in r["top_ms"].items()),
+        )))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                                         capture_output=True, text=True).stdout.strip(),
+                "python": platform.python_version(),
+                "taken_at": datetime.now(timezone.utc).isoformat(),
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import calendar
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from usaweather import columnar, demand, incremental, revisions
+from usaweather.incremental import GridTracker
+from usaweather.noaa import Periods
+
+T0 = datetime(2026, 1, 5, tzinfo=timezone(timedelta(hours=-5)))
+
+
+def periods(temps, start=0, version="v1"):
+    out = Periods(
+        {"startTime": (T0 + timedelta(hours=start + h)).isoformat(), "temperature": int(t), "shortForecast": ""}
+        for h, t in enumerate(temps)
+    )
+    out.update_time = version
+    return out
+
+
+def states(*names):
+    return {n: (n, 0.0, 0.0, float(k + 1)) for k, n in enumerate(names)}
+
+
+def assert_same(tracked, forecasts, points):
+    population = [points[n][3] for n in points]
+    full = demand.evaluate(columnar.ingest({n: forecasts.get(n, []) for n in points}), population)
+    got = tracked.demand
+    np.testing.assert_array_equal(got.hours, full.hours)
+    np.testing.assert_array_equal(got.valid, full.valid)
+    np.testing.assert_array_equal(got.population, full.population)
+    np.testing.assert_array_equal(got.day_index, full.day_index)
+    assert got.now_index == full.now_index
+    np.testing.assert_allclose(got.hourly_weighted, full.hourly_weighted, rtol=1e-9)
+
+
+# -----------------------------------------------------
+# GridTracker vs a full demand.evaluate() pass
+# -----------------------------------------------------
+def test_tracker_matches_evaluate_with_staggered_and_failed_grids():
+    rng = np.random.default_rng(0)
+    points = states("a", "b", "c")
+    forecasts = {
+        "a": periods(rng.integers(-10, 100, 60)),
+        "b": periods(rng.integers(-10, 100, 50), start=3),  # issued 3 h later
+        "c": [],                                              # failed
+    }
+    tracker = GridTracker(points)
+    assert_same(tracker.apply(forecasts), forecasts, points)
+
+    # b re-issued, c recovers – only they are re-ingested
+    forecasts = dict(forecasts, b=periods(rng.integers(-10, 100, 50), start=3, version="v2"),
+                     c=periods(rng.integers(-10, 100, 40), start=1))
+    tracked = tracker.apply(forecasts)
+    assert sorted(tracked.changed) == ["b", "c"]
+    assert_same(tracked, forecasts, points)
+
+
+def test_tracker_keeps_last_forecast_of_a_grid_that_comes_back_empty(monkeypatch):
+    points = states("a", "b")
+    good = {"a": periods([50] * 48), "b": periods([10] * 48)}
+    tracker = GridTracker(points)
+    before = tracker.apply(good).demand.day_index
+
+    # one failed fetch is not a forecast of nothing
+    np.testing.assert_array_equal(tracker.apply(dict(good, b=[])).demand.day_index, before)
+
+    # past MAX_STALE the location drops out, as in a full pass
+    monkeypatch.setattr(incremental, "MAX_STALE", 0)
+    assert_same(tracker.apply(dict(good, b=[])), dict(good, b=[]), points)
+
+
+# -----------------------------------------------------
+# revisions.diff with coverage gaps
+# -----------------------------------------------------
+def test_diff_previous_index_ignores_locations_the_previous_run_missed():
+    population = np.array([1.0, 1.0])
+    previous = demand.evaluate(columnar.ingest({"a": periods([50] * 48), "b": []}), population)
+    current = demand.evaluate(columnar.ingest({"a": periods([50] * 48), "b": periods([10] * 48)}), population)
+
+    rev = revisions.diff(current, previous)
+    np.testing.assert_array_equal(previous.day_index, [60, 60])
+    np.testing.assert_array_equal(current.day_index, [75, 75])
+    np.testing.assert_array_equal(rev.day_index_prev, [60, 60])
+    np.testing.assert_array_equal(rev.day_index_delta, [15, 15])
+
+
+def test_diff_marks_days_the_previous_run_did_not_cover():
+    population = np.array([1.0])
+    previous = demand.evaluate(columnar.ingest({"a": periods([50] * 24)}), population)
+    current = demand.evaluate(columnar.ingest({"a": periods([50] * 48)}), population)
+
+    rev = revisions.diff(current, previous)
+    assert rev.day_index_prev[0] == 60
+    assert np.isnan(rev.day_index_prev[1]) and np.isnan(rev.day_index_delta[1])
+
+
+# -----------------------------------------------------
+# columnar.parse_times
+# -----------------------------------------------------
+@pytest.mark.parametrize("iso", [
+    "2026-01-05T18:00:00-05:00",
+    "2026-01-05T23:00:00+00:00",
+    "2026-01-06T04:30:00+05:30",
+    "2026-01-05T23:00:00Z",
+])
+def test_parse_times_offsets_and_z(iso):
+    expected = calendar.timegm(datetime(2026, 1, 5, 23, tzinfo=timezone.utc).utctimetuple())
+    assert columnar.parse_times([iso]).tolist() == [expected]
@@ -0,0 +1,3 @@
+# =====================================================
+# USAWEATHER – SHARED ENGINE FOR THE NG DASHBOARDS
+# =====================================================
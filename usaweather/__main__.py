@@ -0,0 +1,5 @@
+import sys
+
+from usaweather.cli import main
+
+sys.exit(main())
@@ -0,0 +1,154 @@
+# =====================================================
+# EDGE-TRIGGERED ALERT ENGINE
+# rules fire once when their signal crosses a threshold,
+# re-arm only after it falls back past the clear level
+# (hysteresis) and respect a per-rule cooldown. All rules
+# are evaluated in one NumPy pass; state lives in one JSON
+# file under CACHE_DIR/alerts shared by every session and
+# process (flock around read-modify-write).
+# =====================================================
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from usaweather import demand, metrics
+from usaweather.config import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: process-local only
+    fcntl = None
+
+ALERTS_DIR = os.path.join(CACHE_DIR, "alerts")
+
+# clear: level the signal must return past to re-arm (default: threshold)
+# above: fire on upward crossings (False: downward)
+Rule = namedtuple("Rule", "name signal threshold clear cooldown above", defaults=(None, 0, True))
+
+Fired = namedtuple("Fired", "rule value")
+
+
+# -----------------------------------------------------
+# signals from a DemandResult
+# -----------------------------------------------------
+def signals(result):
+    """
+    (names, values) – flat signal vector for one snapshot:
+    index.now, index.day<N>, jump.day<N> (day-over-day), and per
+    location coldwave.<name> / heatwave.<name> (forecast hours)
+    """
+    days = result.day_index.astype(np.float64)
+    cold = (result.temps <= demand.COLDWAVE_TEMP).sum(axis=1)
+    heat = (result.temps >= demand.HEATWAVE_TEMP).sum(axis=1)
+
+    names = (
+        ["index.now"]
+        + [f"index.day{d + 1}" for d in range(len(days))]
+        + [f"jump.day{d + 2}" for d in range(len(days) - 1)]
+        + [f"coldwave.{n}" for n in result.names]
+        + [f"heatwave.{n}" for n in result.names]
+    )
+    values = np.concatenate([[result.now_index], days, np.diff(days), cold, heat]).astype(np.float64)
+    return names, values
+
+
+# -----------------------------------------------------
+# engine
+# -----------------------------------------------------
+class AlertEngine:
+    def __init__(self, name, rules):
+        self.path = os.path.join(ALERTS_DIR, f"{name}.json")
+        self.rules = list(rules)
+        self.names = [r.name for r in self.rules]
+        sign = np.array([1.0 if r.above else -1.0 for r in self.rules])
+        self._sign = sign
+        self._on = sign * np.array([r.threshold for r in self.rules], dtype=np.float64)
+        self._off = sign * np.array(
+            [r.threshold if r.clear is None else r.clear for r in self.rules], dtype=np.float64
+        )
+        self._cooldown = np.array([r.cooldown for r in self.rules], dtype=np.float64)
+        self._index = {}
+        self._lock = threading.Lock()
+        self._cached = (None, None)  # (file stamp, (active, fired_at))
+
+    def _positions(self, signal_names):
+        # rule → position in the signal vector; cached per signal layout
+        key = tuple(signal_names)
+        if key not in self._index:
+            where = {n: i for i, n in enumerate(signal_names)}
+            pos = np.array([where.get(r.signal, -1) for r in self.rules], dtype=np.int64)
+            self._index = {key: pos}
+        return self._index[key]
+
+    def _read(self, f):
+        # another process may have written since: re-parse only then
+        st = os.fstat(f.fileno())
+        stamp = (st.st_mtime_ns, st.st_size)
+        if self._cached[0] == stamp:
+            return self._cached[1]
+        f.seek(0)
+        try:
+            state = json.loads(f.read() or "{}")
+        except ValueError:
+            state = {}
+        active = np.array([state.get(n, {}).get("active", False) for n in self.names], dtype=bool)
+        fired_at = np.array([state.get(n, {}).get("fired_at", 0.0) for n in self.names], dtype=np.float64)
+        self._cached = (stamp, (active, fired_at))
+        return active, fired_at
+
+    def _write(self, f, active, fired_at):
+        f.seek(0)
+        f.truncate()
+        json.dump({
+            n: {"active": bool(a), "fired_at": float(t)}
+            for n, a, t in zip(self.names, active, fired_at)
+        }, f)
+        f.flush()
+        st = os.fstat(f.fileno())
+        self._cached = ((st.st_mtime_ns, st.st_size), (active, fired_at))
+
+    def evaluate(self, signal_names, values, now=None):
+        """returns the rules that crossed into alert on this snapshot"""
+        now = time.time() if now is None else now
+        pos = self._positions(signal_names)
+        v = np.where(pos >= 0, np.asarray(values, dtype=np.float64)[pos], np.nan) * self._sign
+
+        os.makedirs(ALERTS_DIR, exist_ok=True)
+        with metrics.span("alerts.evaluate"), self._lock, open(self.path, "a+", encoding="utf-8") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            active, fired_at = self._read(f)
+
+            known = ~np.isnan(v)
+            crossed = known & ~active & (v >= self._on)
+            cleared = known & active & (v < self._off)
+            fire = crossed & (now - fired_at >= self._cooldown)
+
+            new_active = (active | crossed) & ~cleared
+            new_fired_at = np.where(fire, now, fired_at)
+            if (new_active != active).any() or fire.any():
+                self._write(f, new_active, new_fired_at)
+
+        metrics.incr("alerts.fired", int(fire.sum()))
+        return [Fired(self.rules[i], float(v[i] * self._sign[i])) for i in np.flatnonzero(fire)]
+
+    def watch(self, result, now=None):
+        return self.evaluate(*signals(result), now=now)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def engine(name, rules):
+    """process-wide engine per name; rebuilt only when the rule set changes"""
+    rules = list(rules)
+    with _engines_lock:
+        e = _engines.get(name)
+        if e is None or e.rules != rules:
+            e = _engines[name] = AlertEngine(name, rules)
+        return e
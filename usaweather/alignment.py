@@ -0,0 +1,72 @@
+# =====================================================
+# TIME ALIGNMENT (DEMAND ↔ PRICE)
+# one vectorised, tz-aware parse per series, resampling
+# onto a shared calendar and as-of joins – no row-wise
+# .apply, no hardcoded day offsets
+# =====================================================
+import numpy as np
+import pandas as pd
+
+# US gas trades on the Eastern calendar
+TZ = "America/New_York"
+
+CALENDARS = {"hourly": "h", "daily": "D", "trading": "D"}
+
+
+def to_times(values, tz=TZ, assume=None):
+    """
+    parse timestamps in one pass → tz-aware DatetimeIndex in `tz`.
+    naive input is read as `assume` (default: `tz`, so dates don't shift)
+    """
+    t = pd.DatetimeIndex(pd.to_datetime(values, errors="coerce"))
+    if t.tz is None:
+        t = t.tz_localize(assume or tz, ambiguous="NaT", nonexistent="shift_forward")
+    return t.tz_convert(tz)
+
+
+def series(values, times, name=None, tz=TZ, assume=None):
+    s = pd.Series(np.asarray(values), index=to_times(times, tz, assume), name=name)
+    return s[s.index.notna()].sort_index()
+
+
+def resample(s, calendar="daily", how="sum"):
+    """
+    calendar: hourly | daily | trading (weekdays only)
+    how: any pandas aggregation; empty buckets stay NaN
+    """
+    r = s.resample(CALENDARS[calendar])
+    out = r.sum(min_count=1) if how == "sum" else r.agg(how)
+    if calendar == "trading":
+        out = out[out.index.dayofweek < 5]
+    return out
+
+
+def asof_join(left, right, direction="backward", tolerance=None):
+    """attach to every row of `left` the latest `right` value at or before it"""
+    left = left.to_frame() if isinstance(left, pd.Series) else left
+    right = right.to_frame() if isinstance(right, pd.Series) else right
+    return pd.merge_asof(
+        left.sort_index(), right.sort_index(),
+        left_index=True, right_index=True,
+        direction=direction, tolerance=tolerance
+    )
+
+
+def align(left, right, calendar="daily", left_how="sum", right_how="last"):
+    """
+    both series on one gap-free calendar spanning either of them.
+    `right` is carried forward as-of (weekends/holidays) but never past
+    its own last observation.
+    """
+    left = resample(left, calendar, left_how)
+    right = resample(right, calendar, right_how).dropna()
+
+    start = min(left.index.min(), right.index.min())
+    end = max(left.index.max(), right.index.max())
+    index = pd.date_range(start, end, freq=CALENDARS[calendar], name="Date")
+    if calendar == "trading":
+        index = index[index.dayofweek < 5]
+
+    frame = asof_join(left.reindex(index).to_frame(), right)
+    frame.loc[frame.index > right.index.max(), right.name] = np.nan
+    return frame
@@ -0,0 +1,108 @@
+# =====================================================
+# HISTORICAL FORECAST ARCHIVE (APPEND-ONLY PARQUET)
+#   <ARCHIVE_DIR>/<location set>/issue_date=YYYY-MM-DD/*.parquet
+# one file per refresh that changed at least one grid;
+# a row per (location, valid hour) with the temperature
+# and the indices computed from that snapshot.
+# USAWEATHER_ARCHIVE_DIR="" turns archiving off.
+# =====================================================
+import os
+import threading
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from usaweather import metrics
+from usaweather.config import CACHE_DIR
+from usaweather.demand import DAY_HOURS
+
+ARCHIVE_DIR = os.environ.get("USAWEATHER_ARCHIVE_DIR", os.path.join(CACHE_DIR, "archive"))
+
+_lock = threading.Lock()
+
+
+def to_table(tracked, issued_at):
+    import pyarrow as pa
+
+    batch, d = tracked.batch, tracked.demand
+    n = batch.size
+
+    # map each row onto the demand result's hour / day columns
+    col = np.searchsorted(d.hours, batch.time)
+    ok = col < len(d.hours)
+    ok[ok] = d.hours[col[ok]] == batch.time[ok]
+    hourly = np.full(n, np.nan)
+    hourly[ok] = d.hourly_weighted[col[ok]]
+    day = np.full(n, -1, dtype=np.int16)
+    day[ok] = d.day_index[col[ok] // DAY_HOURS]
+
+    updates = [getattr(tracked.forecasts.get(name), "update_time", None) for name in batch.names]
+    codes = pa.array(batch.state.astype(np.int32))
+    utc = pa.timestamp("s", tz="UTC")
+
+    return pa.table({
+        "location": pa.DictionaryArray.from_arrays(codes, pa.array(batch.names)),
+        "issue_time": pa.array(np.full(n, int(issued_at.timestamp()), dtype=np.int64), type=utc),
+        "noaa_update_time": pa.DictionaryArray.from_arrays(codes, pa.array(updates, type=pa.string())),
+        "valid_time": pa.array(batch.time, type=utc),
+        "temp_c": pa.array(batch.temp_c),
+        "hourly_weighted": pa.array(hourly),
+        "day_index": pa.array(day, mask=day < 0),
+        "now_index": pa.array(np.full(n, d.now_index, dtype=np.int16)),
+    })
+
+
+def append(location_set, tracked, issued_at=None):
+    """
+    write one refresh snapshot; skipped when nothing changed since the
+    last one (or archiving is off / pyarrow missing). Returns the path.
+    """
+    if not ARCHIVE_DIR or not tracked.changed or not tracked.batch.size:
+        return None
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+
+    issued_at = issued_at or datetime.now(timezone.utc)
+    folder = os.path.join(ARCHIVE_DIR, location_set, f"issue_date={issued_at:%Y-%m-%d}")
+    path = os.path.join(folder, f"{issued_at:%H%M%S%f}.parquet")
+
+    with metrics.span("archive.write"), _lock:
+        try:
+            os.makedirs(folder, exist_ok=True)
+            tmp = f"{path}.tmp"
+            pq.write_table(to_table(tracked, issued_at), tmp, compression="zstd")
+            os.replace(tmp, path)
+        except OSError:
+            return None
+    return path
+
+
+def read(location_set, start, end=None, columns=None):
+    """
+    rows issued between `start` and `end` (dates, inclusive) as a DataFrame;
+    only the matching issue_date partitions are opened
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    end = end or start
+    root = os.path.join(ARCHIVE_DIR, location_set)
+    if not os.path.isdir(root):
+        return pa.table({}).to_pandas()
+
+    with metrics.span("archive.read"):
+        dataset = ds.dataset(
+            root,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("issue_date", pa.string())]), flavor="hive"),
+        )
+        between = (ds.field("issue_date") >= _day(start)) & (ds.field("issue_date") <= _day(end))
+        return dataset.to_table(columns=columns, filter=between).to_pandas()
+
+
+def _day(value):
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
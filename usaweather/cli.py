@@ -0,0 +1,126 @@
+# =====================================================
+# HEADLESS CLI (CRON / PIPELINES)
+#   python -m usaweather index --horizon 7d --format json
+# runs the same NOAA → demand pipeline as the dashboards
+# without Streamlit or pandas; heavy modules are imported
+# only once a command actually runs.
+# exit status: 0 ok, 1 no NOAA data, 2 any other failure
+# =====================================================
+import argparse
+import csv
+import json
+import re
+import sys
+from datetime import datetime, timezone
+
+LOCATION_SETS = ("us50", "top5", "metros")
+
+
+def _horizon(value):
+    m = re.fullmatch(r"\s*(\d+)\s*([hd]?)\s*", value.lower())
+    if not m or int(m.group(1)) == 0:
+        raise argparse.ArgumentTypeError("expected e.g. 48h or 7d")
+    return int(m.group(1)) * (24 if m.group(2) in ("d", "") else 1)
+
+
+def _locations(name):
+    from usaweather import locations
+
+    if name == "top5":
+        return locations.TOP5_STATES
+    if name == "metros":
+        return locations.load_points()
+    return locations.US_STATES
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(int(epoch), timezone.utc).isoformat()
+
+
+def compute_index(location_set="us50", horizon=7 * 24):
+    """the dashboards' NG index as plain data (dict)"""
+    from usaweather import demand
+    from usaweather.demand import DAY_HOURS
+    from usaweather.incremental import tracker
+
+    # same tracker name as the pages, so the archive/history line up
+    result = tracker(location_set, _locations(location_set)).refresh().demand
+    hours = min(horizon, len(result.hours))
+    days = -(-hours // DAY_HOURS)
+
+    # whole days match the dashboards; a day the horizon cuts short is
+    # indexed over its hours inside the horizon only
+    day_index = [int(i) for i in result.day_index[:days]]
+    if hours % DAY_HOURS and result.population.sum():
+        start = (days - 1) * DAY_HOURS
+        weight = demand.day_weight(result.temps[:, start:hours], result.population)
+        day_index[-1] = int(min(100, weight[0] / result.population.sum() * demand.INDEX_SCALE))
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "locations": location_set,
+        "locations_with_data": int(result.valid.sum()),
+        "locations_total": len(result.names),
+        "horizon_hours": hours,
+        "now_index": int(result.now_index),
+        "days": [
+            {"day": d + 1, "start": _iso(result.hours[d * DAY_HOURS]),
+             "hours": min(DAY_HOURS, hours - d * DAY_HOURS), "index": day_index[d]}
+            for d in range(days)
+        ],
+        "hourly": [
+            {"time": _iso(t), "weighted_demand": round(float(w), 3)}
+            for t, w in zip(result.hours[:hours], result.hourly_weighted[:hours])
+        ],
+    }
+
+
+def _write(report, fmt, hourly, out):
+    if fmt == "json":
+        if not hourly:
+            report = {k: v for k, v in report.items() if k != "hourly"}
+        json.dump(report, out, indent=2)
+        out.write("\n")
+        return
+
+    rows = report["hourly"] if hourly else report["days"]
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else ["day", "start", "hours", "index"])
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def cmd_index(args):
+    try:
+        report = compute_index(args.locations, args.horizon)
+    except Exception as e:
+        # cron wants one line on stderr and a status, not a traceback
+        print(f"usaweather: index failed: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+    if report["locations_with_data"] == 0:
+        print("usaweather: no NOAA forecast data available", file=sys.stderr)
+        return 1
+    try:
+        _write(report, args.format, args.hourly, sys.stdout)
+        sys.stdout.flush()
+    except OSError as e:  # closed pipe / full disk downstream
+        print(f"usaweather: write failed: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m usaweather", description="NG weather-demand index, headless")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("index", help="population-weighted NG demand index per forecast day")
+    p.add_argument("--horizon", type=_horizon, default=7 * 24, help="e.g. 48h, 7d (default 7d)")
+    p.add_argument("--format", choices=("json", "csv"), default="json")
+    p.add_argument("--locations", choices=LOCATION_SETS, default="us50")
+    p.add_argument("--hourly", action="store_true", help="include / emit the hourly weighted demand")
+    p.set_defaults(func=cmd_index)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
@@ -0,0 +1,83 @@
+# =====================================================
+# SHARED POOLED HTTP CLIENT
+# one requests.Session for the whole process: per-host
+# keep-alive pools, gzip, default timeouts. urllib3 pools
+# are thread-safe, so the refresher workers share it.
+# =====================================================
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from usaweather import metrics
+from usaweather.config import HEADERS
+from usaweather.replay import MODE, ReplayAdapter
+
+POOL_HOSTS = 10      # distinct hosts kept pooled
+POOL_SIZE = 16       # keep-alive connections per host (>= NOAA workers)
+DEFAULT_TIMEOUT = (5, 20)  # connect, read
+
+_session = None
+_lock = threading.Lock()
+
+
+def session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                s = requests.Session()
+                s.headers.update(HEADERS)
+                s.headers["Accept-Encoding"] = "gzip, deflate"
+                if MODE == "live":
+                    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE)
+                else:
+                    adapter = ReplayAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
+
+def request(method, url, **kwargs):
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    host = urlsplit(url).netloc
+    metrics.incr("upstream." + host)
+    with metrics.span("upstream." + host):
+        return session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def stats():
+    """Per-host connections opened vs requests sent, and the reuse ratio."""
+    out = {}
+    if _session is None:
+        return out
+    for adapter in {id(a): a for a in _session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None or not pool.num_requests:
+                continue
+            out[pool.host] = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+                "reuse": 1 - pool.num_connections / pool.num_requests,
+            }
+    return out
+
+
+def _reuse_gauges():
+    for host, s in stats().items():
+        yield "usaweather_http_connection_reuse_ratio", {"host": host}, round(s["reuse"], 4)
+
+
+metrics.add_collector(_reuse_gauges)
@@ -0,0 +1,126 @@
+# =====================================================
+# COLUMNAR FORECAST INGESTION
+# NOAA periods → preallocated NumPy columns
+#   state  : int16 code into `names`
+#   time   : int64 epoch seconds (UTC)
+#   temp_c : float32
+# =====================================================
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+# "2025-01-06T18:00:00-05:00"
+_ISO_LEN = 25
+
+
+class ForecastBatch(namedtuple("ForecastBatch", "names state time temp_c short_forecast")):
+    __slots__ = ()
+
+    @property
+    def size(self):
+        return len(self.time)
+
+    @property
+    def counts(self):
+        return np.bincount(self.state, minlength=len(self.names))
+
+
+def f_to_c(temp_f):
+    return (np.asarray(temp_f, dtype=np.float32) - 32) * np.float32(5 / 9)
+
+
+def parse_times(iso):
+    """
+    vectorised ISO-8601 (with ±HH:MM offset or Z) → int64 epoch seconds
+    """
+    iso = np.ascontiguousarray(iso, dtype=f"U{_ISO_LEN}")
+    local = iso.astype("U19").astype("datetime64[s]").astype(np.int64)
+
+    cp = iso.view(np.uint32).reshape(len(iso), _ISO_LEN).astype(np.int64)
+    sign = np.where(cp[:, 19] == ord("-"), -1, np.where(cp[:, 19] == ord("+"), 1, 0))
+    hh = (cp[:, 20] - 48) * 10 + (cp[:, 21] - 48)
+    mm = (cp[:, 23] - 48) * 10 + (cp[:, 24] - 48)
+
+    return local - sign * (hh * 3600 + mm * 60)
+
+
+def ingest(forecasts):
+    """
+    forecasts: {name: periods} as returned by fetch_all_hourly
+    """
+    names = list(forecasts)
+    counts = np.fromiter(
+        (len(forecasts[n]) for n in names), dtype=np.int64, count=len(names)
+    )
+    n = int(counts.sum())
+
+    temp_f = np.empty(n, dtype=np.float32)
+    short = np.empty(n, dtype=object)
+
+    i = 0
+    for name, k in zip(names, counts):
+        periods = forecasts[name]
+        temp_f[i:i + k] = [p["temperature"] for p in periods]
+        # a handful of distinct phrases – share one str object per phrase
+        short[i:i + k] = [sys.intern(p.get("shortForecast") or "") for p in periods]
+        i += k
+
+    return ForecastBatch(
+        names=names,
+        state=np.repeat(np.arange(len(names), dtype=np.int16), counts),
+        time=_period_times(forecasts, names, counts),
+        temp_c=f_to_c(temp_f),
+        short_forecast=short,
+    )
+
+
+def _period_times(forecasts, names, counts):
+    """
+    hourly periods are back to back, so a location's times are usually
+    first + 3600·i – parse only first/last startTime and fall back to a
+    full parse for the (rare) location whose series has a gap
+    """
+    has = np.flatnonzero(counts)
+    k = counts[has]
+    first = parse_times([forecasts[names[j]][0]["startTime"] for j in has])
+    last = parse_times([forecasts[names[j]][-1]["startTime"] for j in has])
+
+    starts = np.cumsum(counts) - counts
+    step = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(starts, counts)
+    times = np.repeat(first, k) + step * 3600
+
+    for j in has[last - first != (k - 1) * 3600]:
+        rows = slice(starts[j], starts[j] + counts[j])
+        times[rows] = parse_times([p["startTime"] for p in forecasts[names[j]]])
+    return times
+
+
+def to_frame(batch, decimals=None):
+    import pandas as pd
+
+    temp = batch.temp_c.astype(np.float64)
+    if decimals is not None:
+        temp = temp.round(decimals)
+
+    return pd.DataFrame({
+        "State": pd.Categorical.from_codes(batch.state, categories=batch.names),
+        "Time": pd.to_datetime(batch.time, unit="s", utc=True),
+        "Temp (°C)": temp,
+        "Forecast": batch.short_forecast,
+    })
+
+
+def concat(parts, names):
+    """
+    parts: one single-location ForecastBatch (or None) per name
+    """
+    parts = [p if p is not None else ingest({n: []}) for p, n in zip(parts, names)]
+    counts = [p.size for p in parts]
+    return ForecastBatch(
+        names=list(names),
+        state=np.repeat(np.arange(len(names), dtype=np.int16), counts),
+        time=np.concatenate([p.time for p in parts]),
+        temp_c=np.concatenate([p.temp_c for p in parts]),
+        short_forecast=np.concatenate([p.short_forecast for p in parts]),
+    )
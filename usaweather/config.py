@@ -0,0 +1,18 @@
+# =====================================================
+# SHARED PATHS / SETTINGS
+# =====================================================
+import os
+
+CACHE_DIR = os.environ.get(
+    "USAWEATHER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "usaweather")
+)
+
+# api.weather.gov asks every client to identify itself with a contact
+HEADERS = {"User-Agent": "weather-ng-dashboard (research@example.com)"}
+
+# Telegram bot used for alerts; override per deployment
+TELEGRAM_TOKEN = os.environ.get(
+    "USAWEATHER_TELEGRAM_TOKEN", "8268990134:AAGJJQrPzbi_3ROJWlDzF1sOl1RJLWP1t50"
+)
+TELEGRAM_CHAT_IDS = os.environ.get("USAWEATHER_TELEGRAM_CHATS", "5332984891").split(",")
@@ -0,0 +1,187 @@
+# =====================================================
+# VECTORISED NG DEMAND ENGINE
+# one pass over a (location × hour) temperature matrix
+# for gas_score, HDD / CDD demand and the 0–100 index
+# =====================================================
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+HEATWAVE_TEMP = 35     # °C
+COLDWAVE_TEMP = -5     # °C
+
+HDD_BASE = 18          # °C
+CDD_BASE = 22          # °C
+HDD_WEIGHT = 1.3
+CDD_WEIGHT = 0.7
+
+INDEX_SCALE = 60
+DAY_HOURS = 24
+
+DemandResult = namedtuple("DemandResult", [
+    "names",            # location names, matrix row order
+    "hours",            # int64 epoch seconds, matrix column order
+    "temps",            # (loc × hour) °C, NaN where no forecast
+    "valid",            # bool per location – has any forecast
+    "population",       # weights, 0 for locations without data
+    "now_temp",         # first forecast hour per location
+    "now_score",        # gas_score(now_temp)
+    "now_index",        # 0–100, population weighted
+    "day_temp",         # (loc × day) mean °C
+    "day_score",        # gas_score(day_temp)
+    "day_index",        # int 0–100 per day
+    "hourly_weighted",  # per hour, summed over locations
+])
+
+
+# =====================================================
+# MODELS (ELEMENTWISE, ANY SHAPE)
+# =====================================================
+def gas_score(temp):
+    temp = np.asarray(temp, dtype=np.float32)
+    score = np.where(
+        temp <= COLDWAVE_TEMP, 1.5, np.where(temp >= HEATWAVE_TEMP, 1.1, 1.0)
+    ).astype(np.float32)
+    return np.where(np.isnan(temp), np.nan, score)
+
+
+def hdd(temp):
+    return np.clip(HDD_BASE - np.asarray(temp), 0, None)
+
+
+def cdd(temp):
+    return np.clip(np.asarray(temp) - CDD_BASE, 0, None)
+
+
+def ng_demand(temp):
+    return hdd(temp) * HDD_WEIGHT + cdd(temp) * CDD_WEIGHT
+
+
+def risk_flag(temp):
+    temp = np.asarray(temp)
+    return np.select(
+        [temp >= HEATWAVE_TEMP, temp <= COLDWAVE_TEMP],
+        ["🔥 Heatwave", "❄️ Coldwave"],
+        "Normal"
+    )
+
+
+def weighted_index(score, population):
+    """
+    score: (loc × …), population: (loc,) – 0–100 index over axis 0
+    """
+    total = population.sum()
+    if total == 0:
+        return np.zeros(score.shape[1:], dtype=np.int64)
+    weighted = np.nansum(score * population.reshape((-1,) + (1,) * (score.ndim - 1)), axis=0)
+    return np.minimum(100, weighted / total * INDEX_SCALE).astype(np.int64)
+
+
+def group_index(score, population, codes, n_groups):
+    """
+    population-weighted 0–100 index per group (e.g. county → state);
+    score: (loc,) or (loc × day), codes: group id per location
+    """
+    score = np.nan_to_num(np.asarray(score, dtype=np.float64))
+    pop = population.reshape((-1,) + (1,) * (score.ndim - 1))
+
+    weighted = np.zeros((n_groups,) + score.shape[1:])
+    np.add.at(weighted, codes, score * pop)
+    totals = np.bincount(codes, weights=population, minlength=n_groups)
+    totals = totals.reshape((-1,) + (1,) * (score.ndim - 1))
+
+    ratio = np.divide(weighted, totals, out=np.zeros_like(weighted), where=totals > 0)
+    return np.minimum(100, ratio * INDEX_SCALE).astype(np.int64)
+
+
+# =====================================================
+# MATRIX + EVALUATION
+# =====================================================
+def temperature_matrix(batch):
+    hours = np.unique(batch.time)
+    temps = np.full((len(batch.names), len(hours)), np.nan, dtype=np.float32)
+    temps[batch.state, np.searchsorted(hours, batch.time)] = batch.temp_c
+    return hours, temps
+
+
+def daily_mean(temps, day_hours=DAY_HOURS):
+    n_loc, n_hours = temps.shape
+    n_days = -(-n_hours // day_hours)
+    padded = np.full((n_loc, n_days * day_hours), np.nan, dtype=temps.dtype)
+    padded[:, :n_hours] = temps
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN days
+        return np.nanmean(padded.reshape(n_loc, n_days, day_hours), axis=2)
+
+
+def summarize(names, hours, temps, population, hourly_weighted, day_weight, day_hours=DAY_HOURS):
+    """
+    assemble a DemandResult from precomputed aggregates; `population`
+    is already zeroed for locations without data
+    """
+    has_data = ~np.isnan(temps)
+    if temps.shape[1] == 0:
+        # no location returned a forecast – an all-NaN, zero-index result
+        now_temp = np.full(len(temps), np.nan, dtype=np.float32)
+    else:
+        first = np.argmax(has_data, axis=1)
+        now_temp = temps[np.arange(len(temps)), first]
+    now_score = gas_score(now_temp)
+
+    day_temp = daily_mean(temps, day_hours)
+    total = population.sum()
+    day_index = (
+        np.minimum(100, day_weight / total * INDEX_SCALE).astype(np.int64)
+        if total else np.zeros(len(day_weight), dtype=np.int64)
+    )
+
+    return DemandResult(
+        names=names,
+        hours=hours,
+        temps=temps,
+        valid=has_data.any(axis=1),
+        population=population,
+        now_temp=now_temp,
+        now_score=now_score,
+        now_index=int(weighted_index(now_score, population)),
+        day_temp=day_temp,
+        day_score=gas_score(day_temp),
+        day_index=day_index,
+        hourly_weighted=hourly_weighted,
+    )
+
+
+def day_weight(temps, population, day_hours=DAY_HOURS):
+    # Σ gas_score(daily mean) × population, per day
+    return np.nansum(gas_score(daily_mean(temps, day_hours)) * population[:, None], axis=0)
+
+
+def hour_weight(temps, population):
+    # Σ HDD/CDD demand × population, per hour
+    return np.nansum(ng_demand(temps) * population[:, None], axis=0)
+
+
+def evaluate(batch, population, day_hours=DAY_HOURS):
+    """
+    batch: columnar.ForecastBatch, population: weights in batch.names order
+    """
+    hours, temps = temperature_matrix(batch)
+    valid = ~np.isnan(temps).all(axis=1)
+    population = np.where(valid, np.asarray(population, dtype=np.float64), 0.0)
+
+    return summarize(
+        batch.names, hours, temps, population,
+        hour_weight(temps, population),
+        day_weight(temps, population, day_hours),
+        day_hours,
+    )
+
+
+def hourly_frame(result):
+    import pandas as pd
+
+    return pd.DataFrame({
+        "Time": pd.to_datetime(result.hours, unit="s", utc=True),
+        "Weighted_Demand": result.hourly_weighted,
+    })
@@ -0,0 +1,96 @@
+# =====================================================
+# DIAGNOSTICS PANEL (collapsible, bottom of every page)
+# stage timings, upstream latency, cache hit/miss and
+# connection reuse from usaweather.metrics – plus the
+# snapshot helpers every page shares
+# =====================================================
+import time
+
+from usaweather import metrics
+
+AUTO_REFRESH_POLL = 30  # seconds between checks for a newer snapshot
+
+
+def page_timer():
+    return time.perf_counter()
+
+
+def age_caption(snap, name):
+    import streamlit as st
+
+    age = snap.age_of(name)
+    st.caption("🕒 Snapshot age: " + ("n/a" if age is None else f"{age:.0f}s"))
+
+
+def require_weather(snap, name):
+    """the job's TrackedForecast, or an error and st.stop() when there is none"""
+    import streamlit as st
+
+    tracked = snap.data.get(name)
+    # a failed cold-start fetch publishes None; no location with data → zero population
+    if tracked is None or tracked.demand.population.sum() == 0:
+        st.error("Weather data unavailable")
+        st.stop()
+    return tracked
+
+
+def auto_refresh(*names, every=AUTO_REFRESH_POLL):
+    """
+    rerun the page once the refresher has published a newer value for
+    any of `names`; checked from a fragment, so nothing else reruns
+    """
+    import streamlit as st
+
+    from usaweather.refresher import REFRESHER
+
+    def stamps():
+        updated = REFRESHER.latest().updated
+        return tuple(updated.get(n) for n in names)
+
+    seen = stamps()
+
+    @st.fragment(run_every=every)
+    def poll():
+        if stamps() != seen:
+            st.rerun()
+
+    poll()
+
+
+def panel(page, started):
+    import pandas as pd
+    import streamlit as st
+
+    from usaweather import client
+
+    metrics.record(f"render.{page}", time.perf_counter() - started)
+    snap = metrics.snapshot()
+
+    with st.expander("🩺 Diagnostics"):
+        st.markdown("**Stage / upstream timings** (process-wide since start)")
+        st.dataframe(pd.DataFrame([
+            {
+                "Span": name,
+                "Calls": t["count"],
+                "Mean (ms)": round(t["total_s"] / t["count"] * 1000, 1),
+                "p50 (ms)": round(t["p50_s"] * 1000, 1),
+                "p95 (ms)": round(t["p95_s"] * 1000, 1),
+                "Max (ms)": round(t["max_s"] * 1000, 1),
+                "Total (s)": round(t["total_s"], 2),
+            }
+            for name, t in sorted(snap["timings"].items())
+        ]), use_container_width=True, hide_index=True)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.markdown("**Events** (upstream calls, cache hits/misses, retries)")
+            st.dataframe(pd.DataFrame(
+                sorted(snap["counters"].items()), columns=["Event", "Count"]
+            ), use_container_width=True, hide_index=True)
+        with c2:
+            st.markdown("**Connection reuse**")
+            st.dataframe(pd.DataFrame([
+                {"Host": host, "Connections": s["connections"], "Requests": s["requests"],
+                 "Reuse %": round(s["reuse"] * 100, 1)}
+                for host, s in sorted(client.stats().items())
+            ]), use_container_width=True, hide_index=True)
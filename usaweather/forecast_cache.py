@@ -0,0 +1,127 @@
+# =====================================================
+# PROCESS-WIDE FORECAST CACHE (SHARED BY ALL SESSIONS)
+# keyed by grid cell (forecastHourly URL), honours NOAA
+# Cache-Control / Expires and revalidates with ETag /
+# If-Modified-Since; on an upstream error a recently
+# checked entry is served stale rather than dropped
+# =====================================================
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from usaweather import metrics
+from usaweather.config import HEADERS
+from usaweather.scheduler import SCHEDULER
+
+# used when NOAA sends no usable freshness headers
+DEFAULT_TTL = 300
+# how long after its last successful check an entry may stand in for a failed fetch
+STALE_IF_ERROR = 6 * 3600
+
+_MAX_AGE = re.compile(r"(?:s-maxage|max-age)\s*=\s*(\d+)")
+
+_lock = threading.Lock()
+_entries = {}
+_key_locks = {}
+
+
+def _freshness(headers):
+    cc = headers.get("Cache-Control", "")
+    if "no-store" in cc or "no-cache" in cc:
+        return 0
+    m = _MAX_AGE.search(cc)
+    if m:
+        return int(m.group(1))
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return max(0, parsedate_to_datetime(expires).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0
+    return DEFAULT_TTL
+
+
+def _key_lock(url):
+    with _lock:
+        return _key_locks.setdefault(url, threading.Lock())
+
+
+def _usable(entry, now):
+    return entry is not None and now - entry["checked_at"] < STALE_IF_ERROR
+
+
+def _stale(entry):
+    # one 5xx / timeout should not drop a location from the index
+    metrics.incr("cache.forecast.stale")
+    return 200, entry["periods"], entry["update_time"]
+
+
+def fetch(url):
+    """
+    returns (status_code, periods, update_time) – periods is the full,
+    untruncated list; update_time is NOAA's updateTime / generatedAt
+    """
+    # one upstream request per grid cell no matter how many sessions ask
+    with _key_lock(url):
+        entry = _entries.get(url)
+        now = time.time()
+        if entry and now < entry["expires_at"]:
+            metrics.incr("cache.forecast.hit")
+            return 200, entry["periods"], entry["update_time"]
+
+        headers = dict(HEADERS)
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with metrics.span("fetch.noaa"):
+                r = SCHEDULER.get(url, headers=headers)
+        except requests.RequestException:
+            if _usable(entry, now):
+                return _stale(entry)
+            raise
+
+        if r.status_code == 304 and entry:
+            metrics.incr("cache.forecast.revalidated")
+            entry["expires_at"] = now + _freshness(r.headers)
+            entry["checked_at"] = now
+            return 200, entry["periods"], entry["update_time"]
+
+        metrics.incr("cache.forecast.miss")
+        if r.status_code != 200:
+            # 404: the grid was re-assigned – the caller re-resolves it
+            if r.status_code != 404 and _usable(entry, now):
+                return _stale(entry)
+            return r.status_code, [], None
+
+        with metrics.span("parse.noaa"):
+            props = r.json()["properties"]
+        periods = props["periods"]
+        update_time = props.get("updateTime") or props.get("generatedAt")
+        entry = {
+            "periods": periods,
+            "update_time": update_time,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "expires_at": now + _freshness(r.headers),
+            "checked_at": now,
+        }
+        # the per-URL lock only orders fetches of this cell – the dict
+        # itself is shared with expire_all() and other cells
+        with _lock:
+            _entries[url] = entry
+        return 200, periods, update_time
+
+
+def expire_all():
+    # "Refresh Now" – keep the bodies so refreshes become conditional GETs
+    with _lock:
+        entries = list(_entries.values())
+    for entry in entries:
+        entry["expires_at"] = 0
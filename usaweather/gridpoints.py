@@ -0,0 +1,107 @@
+# =====================================================
+# PERSISTENT /points → GRIDPOINT CACHE
+# lat/lon → office / gridX / gridY / forecastHourly URL
+# misses only mark the cache dirty; the file is written
+# once per batch by flush() (and at exit)
+# =====================================================
+import atexit
+import json
+import os
+import threading
+import time
+
+import requests
+
+from usaweather import metrics
+from usaweather.config import CACHE_DIR, HEADERS
+from usaweather.scheduler import SCHEDULER
+
+# gridpoint assignments for a fixed coordinate change very rarely
+GRIDPOINT_TTL = 30 * 24 * 3600
+
+CACHE_PATH = os.path.join(CACHE_DIR, "gridpoints.json")
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_cache = None
+_dirty = False
+
+
+def _key(lat, lon):
+    return f"{float(lat):.4f},{float(lon):.4f}"
+
+
+def _load():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_PATH, encoding="utf-8") as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def flush():
+    """write the cache if anything changed since the last flush"""
+    global _dirty
+    with _flush_lock:
+        with _lock:
+            if not _dirty:
+                return
+            data = dict(_cache)
+            _dirty = False
+        try:
+            os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+            tmp = f"{CACHE_PATH}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp, CACHE_PATH)
+        except OSError:
+            with _lock:
+                _dirty = True
+
+
+atexit.register(flush)
+
+
+def _lookup(lat, lon):
+    try:
+        with metrics.span("fetch.noaa"):
+            p = SCHEDULER.get(f"https://api.weather.gov/points/{lat},{lon}", headers=HEADERS)
+    except requests.RequestException:
+        return None
+    if p.status_code != 200:
+        return None
+    props = p.json()["properties"]
+    return {
+        "office": props.get("gridId"),
+        "gridX": props.get("gridX"),
+        "gridY": props.get("gridY"),
+        "forecastHourly": props["forecastHourly"],
+        "resolved_at": time.time(),
+    }
+
+
+def resolve(lat, lon, refresh=False):
+    global _dirty
+    key = _key(lat, lon)
+
+    with _lock:
+        entry = _load().get(key)
+    if entry and not refresh and time.time() - entry["resolved_at"] < GRIDPOINT_TTL:
+        metrics.incr("cache.gridpoints.hit")
+        return entry
+
+    metrics.incr("cache.gridpoints.miss")
+
+    fresh = _lookup(lat, lon)
+    if fresh is None:
+        # NOAA hiccup – a stale mapping is still far better than nothing
+        return entry
+
+    with _lock:
+        _load()[key] = fresh
+        _dirty = True
+    return fresh
+
@@ -0,0 +1,181 @@
+# =====================================================
+# INCREMENTAL DEMAND AGGREGATES
+# tracks each grid's NOAA updateTime and only re-ingests /
+# re-weights the locations whose forecast actually changed;
+# a location that comes back empty keeps its last forecast
+# for up to MAX_STALE
+# =====================================================
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from usaweather import archive, demand, metrics
+from usaweather.columnar import ForecastBatch, concat, ingest
+from usaweather.noaa import HOURS, fetch_all_hourly
+
+# grids fetched at different times start on different hours
+WINDOW = HOURS + 24
+
+# seconds a location keeps its last good forecast while NOAA returns nothing
+MAX_STALE = 6 * 3600
+
+# previous: DemandResult of the last run that differed (None on the first)
+TrackedForecast = namedtuple("TrackedForecast", "forecasts batch demand changed previous")
+
+
+def _version(periods):
+    if not periods:
+        return None
+    return getattr(periods, "update_time", None), periods[0]["startTime"], len(periods)
+
+
+class GridTracker:
+    def __init__(self, states, name=None):
+        self.states = states
+        self.name = name
+        self.names = list(states)
+        self.population = np.array([states[n][3] for n in self.names], dtype=np.float64)
+
+        n = len(self.names)
+        self._lock = threading.Lock()
+        self._versions = [None] * n
+        self._fresh_at = np.zeros(n)   # when each location last had data
+        self._parts = [None] * n
+        self._base = None
+        self._temps = np.full((n, WINDOW), np.nan, dtype=np.float32)
+        self._weights = np.zeros(n)
+        self._hour_weight = np.zeros(WINDOW)
+        self._day_weight = np.zeros(-(-WINDOW // demand.DAY_HOURS))
+        self._latest = None
+        self._previous = None
+
+    # -------------------------------------------------
+    # public
+    # -------------------------------------------------
+    def refresh(self):
+        tracked = self.apply(fetch_all_hourly(self.states))
+        if self.name:
+            archive.append(self.name, tracked)
+        return tracked
+
+    def apply(self, forecasts):
+        with self._lock:
+            now = time.time()
+            changed, stale = [], 0
+            for i, n in enumerate(self.names):
+                version = _version(forecasts.get(n))
+                if version is not None:
+                    self._fresh_at[i] = now
+                if version == self._versions[i]:
+                    continue
+                if version is None and now - self._fresh_at[i] < MAX_STALE:
+                    # a failed fetch is not a forecast of nothing
+                    stale += 1
+                    continue
+                changed.append(i)
+            metrics.incr("cache.tracker.stale", stale)
+            metrics.incr("cache.tracker.changed", len(changed))
+            metrics.incr("cache.tracker.unchanged", len(self.names) - len(changed) - stale)
+            if changed:
+                with metrics.span("parse.noaa"):
+                    sub = ingest({self.names[i]: forecasts.get(self.names[i], []) for i in changed})
+                with metrics.span("aggregate"):
+                    self._update(forecasts, changed, sub)
+
+            with metrics.span("aggregate"):
+                if changed or self._latest is None:
+                    self._previous, self._latest = self._latest, self._result()
+                return TrackedForecast(
+                    forecasts=forecasts,
+                    batch=concat(self._parts, self.names),
+                    demand=self._latest,
+                    changed=[self.names[i] for i in changed],
+                    previous=self._previous,
+                )
+
+    # -------------------------------------------------
+    # internals
+    # -------------------------------------------------
+    def _update(self, forecasts, changed, sub):
+        # ingest keeps rows grouped by location, so each part is a slice
+        counts = sub.counts
+        ends = np.cumsum(counts)
+        for k, i in enumerate(changed):
+            rows = slice(ends[k] - counts[k], ends[k])
+            self._parts[i] = ForecastBatch(
+                names=[self.names[i]],
+                state=np.zeros(counts[k], dtype=np.int16),
+                time=sub.time[rows],
+                temp_c=sub.temp_c[rows],
+                short_forecast=sub.short_forecast[rows],
+            )
+            self._versions[i] = _version(forecasts.get(self.names[i]))
+
+        starts = [p.time[0] for p in self._parts if p is not None and p.size]
+        base = min(starts) if starts else None
+
+        if base != self._base:
+            # the hour/day windows moved – every contribution changes
+            self._base = base
+            self._rebuild()
+            return
+
+        rows = np.array(changed)
+        old_temps = self._temps[rows]
+        old_weights = self._weights[rows]
+        self._hour_weight -= demand.hour_weight(old_temps, old_weights)
+        self._day_weight -= demand.day_weight(old_temps, old_weights)
+
+        for i in changed:
+            self._write_row(i)
+
+        new_temps = self._temps[rows]
+        new_weights = self._weights[rows]
+        self._hour_weight += demand.hour_weight(new_temps, new_weights)
+        self._day_weight += demand.day_weight(new_temps, new_weights)
+
+    def _write_row(self, i):
+        self._temps[i] = np.nan
+        part = self._parts[i]
+        if part is None or not part.size or self._base is None:
+            self._weights[i] = 0.0
+            return
+        col = (part.time - self._base) // 3600
+        keep = (col >= 0) & (col < WINDOW)
+        self._temps[i, col[keep]] = part.temp_c[keep]
+        self._weights[i] = self.population[i] if keep.any() else 0.0
+
+    def _rebuild(self):
+        for i in range(len(self.names)):
+            self._write_row(i)
+        self._hour_weight = demand.hour_weight(self._temps, self._weights)
+        self._day_weight = demand.day_weight(self._temps, self._weights)
+
+    def _result(self):
+        filled = np.flatnonzero(~np.isnan(self._temps).all(axis=0))
+        n_cols = int(filled[-1]) + 1 if len(filled) else 0
+        n_days = -(-n_cols // demand.DAY_HOURS)
+        base = self._base or 0
+
+        return demand.summarize(
+            self.names,
+            base + np.arange(n_cols, dtype=np.int64) * 3600,
+            self._temps[:, :n_cols].copy(),
+            self._weights.copy(),
+            self._hour_weight[:n_cols].copy(),
+            self._day_weight[:n_days].copy(),
+        )
+
+
+_trackers = {}
+_registry_lock = threading.Lock()
+
+
+def tracker(name, states):
+    # one tracker per location set, shared by every session in the process
+    with _registry_lock:
+        if name not in _trackers:
+            _trackers[name] = GridTracker(states, name)
+        return _trackers[name]
@@ -0,0 +1,81 @@
+# =====================================================
+# SHARED REFRESHER JOBS
+# several pages register the same job name and the
+# refresher keeps the newest callable – so work a job
+# must always do lives here, not in one page. The 50-
+# state job evaluates the Telegram alert rules on every
+# refresh, whether or not anyone has USV1 open.
+# =====================================================
+from datetime import date, timedelta
+
+from usaweather import metrics, telegram
+from usaweather.alerts import Rule, engine
+from usaweather.config import TELEGRAM_CHAT_IDS, TELEGRAM_TOKEN
+from usaweather.demand import COLDWAVE_TEMP
+from usaweather.incremental import tracker
+from usaweather.locations import US_STATES
+
+ALERT_LEVEL = 65
+ALERT_CLEAR = 60     # index must drop below this before ALERT_LEVEL re-arms
+JUMP_LEVEL = 10      # day-over-day index jump
+COLDWAVE_HOURS = 6   # forecast hours at/below the coldwave temperature, per state
+
+ALERT_RULES = [
+    Rule("ng_index", "index.day1", ALERT_LEVEL, clear=ALERT_CLEAR, cooldown=6 * 3600),
+    Rule("ng_jump", "jump.day2", JUMP_LEVEL, clear=JUMP_LEVEL / 2, cooldown=12 * 3600),
+] + [
+    Rule(f"coldwave.{s}", f"coldwave.{s}", COLDWAVE_HOURS, clear=1, cooldown=24 * 3600)
+    for s in US_STATES
+]
+
+
+def _message(fired, result, today):
+    rule = fired.rule.name
+    ng_day1, ng_day2 = int(result.day_index[0]), int(result.day_index[1])
+    if rule == "ng_index":
+        return (
+            f"🚨 NG ALERT 🚨\n"
+            f"Date: {today}\n"
+            f"NG Index: {ng_day1}\n"
+            f"Weather Driven Demand"
+        )
+    if rule == "ng_jump":
+        return (
+            f"📈 NG DEMAND JUMP\n"
+            f"Date: {today + timedelta(days=1)}\n"
+            f"NG Index: {ng_day1} → {ng_day2} ({fired.value:+.0f})"
+        )
+    return (
+        f"❄️ COLDWAVE – {rule.split('.', 1)[1]}\n"
+        f"{fired.value:.0f} forecast hours at or below {COLDWAVE_TEMP}°C"
+    )
+
+
+def alert(result, today=None):
+    """edge-triggered alerts for one DemandResult, queued to Telegram"""
+    today = today or date.today()
+    sender = telegram.dispatcher(TELEGRAM_TOKEN, TELEGRAM_CHAT_IDS)
+    for fired in engine("us50", ALERT_RULES).watch(result):
+        key = telegram.alert_key(fired.rule.name, today, fired.value)
+        sender.send(_message(fired, result, today), dedupe_key=key)
+
+
+_coverage = {"us50": 0}   # locations with data on the last pass
+
+
+def us50():
+    """refresh the 50-state forecast, then run the alert rules on it"""
+    tracked = tracker("us50", US_STATES).refresh()
+    # an outage is not a signal: a pass that lost locations would move the
+    # index on missing data alone, so it is not evaluated
+    covered = int(tracked.demand.valid.sum())
+    last, _coverage["us50"] = _coverage["us50"], covered
+    if covered == 0 or covered < last:
+        metrics.incr("alerts.skipped")
+        return tracked
+    try:
+        alert(tracked.demand)
+    except Exception:
+        # alerting must never cost the pages their weather
+        metrics.incr("alerts.error")
+    return tracked
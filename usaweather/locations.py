@@ -0,0 +1,102 @@
+# =====================================================
+# POPULATION-WEIGHTED POINT TABLES
+# US_STATES: capital + lat/lon + state population
+# (millions) – the dashboards' default index; TOP5_STATES
+# is the five-state subset USWF charts. Metro table
+# bundled: ~120 US metro areas (approx. 2020 census MSA
+# population, millions). A table with the same columns
+# (name,state,lat,lon,population) can be used instead via
+# USAWEATHER_POINTS_TABLE – but every point costs one NOAA
+# forecast call per refresh (two cold) at ~10 req/s, so
+# within the 300 s refresh interval the practical ceiling
+# is ~2,000 points; a full county table (~3,100) does not
+# fit. See benchmarks/bench_highres.py.
+# =====================================================
+import csv
+import os
+from functools import lru_cache
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+METRO_TABLE = os.path.join(DATA_DIR, "metros.csv")
+
+POINTS_TABLE = os.environ.get("USAWEATHER_POINTS_TABLE", METRO_TABLE)
+
+US_STATES = {
+    "California": ("Sacramento", 38.58, -121.49, 39.0),
+    "Texas": ("Austin", 30.26, -97.74, 30.0),
+    "Florida": ("Tallahassee", 30.43, -84.28, 22.0),
+    "New York": ("Albany", 42.65, -73.75, 19.6),
+    "Pennsylvania": ("Harrisburg", 40.27, -76.88, 13.0),
+    "Illinois": ("Springfield", 39.78, -89.65, 12.5),
+    "Ohio": ("Columbus", 39.96, -82.99, 11.8),
+    "Georgia": ("Atlanta", 33.74, -84.38, 11.0),
+    "North Carolina": ("Raleigh", 35.77, -78.63, 10.8),
+    "Michigan": ("Lansing", 42.73, -84.55, 10.0),
+    # --- remaining states (lower weights) ---
+    "Alabama": ("Montgomery", 32.36, -86.30, 5.1),
+    "Alaska": ("Juneau", 58.30, -134.41, 0.7),
+    "Arizona": ("Phoenix", 33.44, -112.07, 7.4),
+    "Arkansas": ("Little Rock", 34.74, -92.28, 3.0),
+    "Colorado": ("Denver", 39.73, -104.99, 5.8),
+    "Connecticut": ("Hartford", 41.76, -72.67, 3.6),
+    "Delaware": ("Dover", 39.15, -75.52, 1.0),
+    "Hawaii": ("Honolulu", 21.30, -157.85, 1.4),
+    "Idaho": ("Boise", 43.61, -116.20, 1.9),
+    "Indiana": ("Indianapolis", 39.76, -86.15, 6.8),
+    "Iowa": ("Des Moines", 41.58, -93.62, 3.2),
+    "Kansas": ("Topeka", 39.05, -95.68, 2.9),
+    "Kentucky": ("Frankfort", 38.20, -84.87, 4.5),
+    "Louisiana": ("Baton Rouge", 30.45, -91.18, 4.6),
+    "Maine": ("Augusta", 44.31, -69.77, 1.3),
+    "Maryland": ("Annapolis", 38.97, -76.49, 6.2),
+    "Massachusetts": ("Boston", 42.36, -71.05, 7.0),
+    "Minnesota": ("Saint Paul", 44.95, -93.09, 5.7),
+    "Mississippi": ("Jackson", 32.29, -90.18, 2.9),
+    "Missouri": ("Jefferson City", 38.57, -92.17, 6.2),
+    "Montana": ("Helena", 46.58, -112.03, 1.1),
+    "Nebraska": ("Lincoln", 40.81, -96.70, 1.9),
+    "Nevada": ("Carson City", 39.16, -119.76, 3.2),
+    "New Hampshire": ("Concord", 43.20, -71.53, 1.4),
+    "New Jersey": ("Trenton", 40.22, -74.76, 9.3),
+    "New Mexico": ("Santa Fe", 35.68, -105.93, 2.1),
+    "North Dakota": ("Bismarck", 46.80, -100.78, 0.8),
+    "Oklahoma": ("Oklahoma City", 35.46, -97.51, 4.0),
+    "Oregon": ("Salem", 44.94, -123.03, 4.2),
+    "Rhode Island": ("Providence", 41.82, -71.41, 1.1),
+    "South Carolina": ("Columbia", 34.00, -81.03, 5.3),
+    "South Dakota": ("Pierre", 44.36, -100.35, 0.9),
+    "Tennessee": ("Nashville", 36.16, -86.78, 7.0),
+    "Utah": ("Salt Lake City", 40.76, -111.89, 3.4),
+    "Vermont": ("Montpelier", 44.26, -72.57, 0.6),
+    "Virginia": ("Richmond", 37.54, -77.43, 8.7),
+    "Washington": ("Olympia", 47.03, -122.90, 7.8),
+    "West Virginia": ("Charleston", 38.34, -81.63, 1.8),
+    "Wisconsin": ("Madison", 43.07, -89.40, 5.9),
+    "Wyoming": ("Cheyenne", 41.13, -104.82, 0.6),
+}
+
+TOP5_STATES = {
+    "Texas": ("Austin", 30.2672, -97.7431, 29.1),
+    "California": ("Sacramento", 38.5816, -121.4944, 39.0),
+    "Florida": ("Tallahassee", 30.4383, -84.2807, 22.6),
+    "New York": ("Albany", 42.6526, -73.7562, 19.6),
+    "Pennsylvania": ("Harrisburg", 40.2732, -76.8867, 12.9),
+}
+
+
+@lru_cache(maxsize=None)
+def load_points(path=POINTS_TABLE):
+    """
+    returns {"<name>, <ST>": (state, lat, lon, population)} – the same
+    shape as US_STATES, so it plugs into fetch_all_hourly / tracker
+    """
+    points = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            points[f"{row['name']}, {row['state']}"] = (
+                row["state"],
+                float(row["lat"]),
+                float(row["lon"]),
+                float(row["population"]),
+            )
+    return points
@@ -0,0 +1,134 @@
+# =====================================================
+# NATURAL GAS PRICES (DHAN MCX / CAPITAL.COM)
+# =====================================================
+import socket
+import ssl
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from usaweather import client, metrics, tradingview
+
+DHAN_NG_URL = "https://dhan.co/commodity/natural-gas-futures-summary/"
+# price and curve share one page download within this window
+DHAN_TTL = 30  # seconds
+
+FUTURES_COLUMNS = [
+    "Contract", "Days to Expiry", "LTP", "Change", "Change %",
+    "Volume", "Open Interest", "OI Change %",
+]
+FUTURES_NUMERIC = FUTURES_COLUMNS[1:]
+
+PRICE_XPATH = "//span[contains(concat(' ', normalize-space(@class), ' '), ' lpu38Head ')]"
+TABLE_XPATH = "//table"
+
+_lock = threading.Lock()
+_page = {"at": 0.0, "html": None}
+_curve = {"df": None}
+
+
+def _dhan_html(timeout):
+    # single flight: concurrent jobs wait for the one download
+    with _lock:
+        if _page["html"] is not None and time.time() - _page["at"] < DHAN_TTL:
+            metrics.incr("cache.dhan.hit")
+            return _page["html"]
+        metrics.incr("cache.dhan.miss")
+        with metrics.span("fetch.dhan"):
+            r = client.get(DHAN_NG_URL, timeout=timeout)
+        r.raise_for_status()
+        _page.update(at=time.time(), html=r.text)
+        return r.text
+
+
+def _first(html, xpath):
+    """
+    first element matching `xpath` in the parsed page – the HTML parser
+    keeps <script>/<style> bodies as text, so class names or "<table"
+    inside CSS / JSON blobs never match, and nested tables close properly
+    """
+    import lxml.html  # only the background jobs parse HTML
+
+    found = lxml.html.document_fromstring(html).xpath(xpath)
+    return found[0] if found else None
+
+
+def _numeric(col):
+    return pd.to_numeric(col.str.replace(r"[₹,%\s]", "", regex=True), errors="coerce")
+
+
+def fetch_mcx_ng_price():
+    try:
+        html = _dhan_html(timeout=5)
+        with metrics.span("parse.dhan"):
+            tag = _first(html, PRICE_XPATH)
+        return float(tag.text_content().replace("₹", "").replace(",", ""))
+    except Exception:
+        return None
+
+
+def parse_futures(html):
+    table = _first(html, TABLE_XPATH)
+    if table is None:
+        return pd.DataFrame(columns=FUTURES_COLUMNS)
+
+    rows = [
+        [td.text_content().strip() for td in tr.findall("td")][:8]
+        for tr in table.iter("tr")
+    ]
+    df = pd.DataFrame([r for r in rows if len(r) == 8], columns=FUTURES_COLUMNS)
+    for col in FUTURES_NUMERIC:
+        df[col] = _numeric(df[col])
+    df["Days to Expiry"] = df["Days to Expiry"].astype("Int64")
+    return df
+
+
+def curve_changes(current, previous):
+    """contracts that are new or whose numbers moved since `previous`"""
+    if previous is None or previous.empty:
+        return set(current["Contract"])
+    cur = current.set_index("Contract")
+    prev = previous.set_index("Contract")
+    common = cur.index.intersection(prev.index)
+    a = cur.loc[common, FUTURES_NUMERIC].to_numpy(dtype=float, na_value=np.nan)
+    b = prev.loc[common, FUTURES_NUMERIC].to_numpy(dtype=float, na_value=np.nan)
+    same = ((a == b) | (np.isnan(a) & np.isnan(b))).all(axis=1)
+    return set(common[~same]) | set(cur.index.difference(prev.index))
+
+
+def fetch_mcx_ng_futures():
+    try:
+        html = _dhan_html(timeout=10)
+        with metrics.span("parse.dhan"):
+            df = parse_futures(html)
+    except Exception:
+        return pd.DataFrame()
+
+    previous = _curve["df"]
+    if previous is not None and len(previous) == len(df) and not curve_changes(df, previous):
+        # unchanged curve: hand back the same object, nothing to re-render
+        metrics.incr("cache.dhan.unchanged")
+        return previous
+    _curve["df"] = df
+    return df
+
+
+def fetch_international_ng(tv):
+    from tvDatafeed import Interval
+
+    try:
+        with metrics.span("fetch.tv"):
+            df = tradingview.bars(tv, "NATURALGAS", "CAPITALCOM", Interval.in_daily, n_bars=1)
+        if df is not None and not df.empty:
+            return float(df["close"].iloc[-1])
+    except (socket.timeout, ssl.SSLError):
+        return None
+
+
+def fetch_ng_daily_history(tv, n_bars=90):
+    from tvDatafeed import Interval
+
+    with metrics.span("fetch.tv"):
+        return tradingview.bars(tv, "NATURALGAS", "CAPITALCOM", Interval.in_daily, n_bars=n_bars)
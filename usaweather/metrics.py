@@ -0,0 +1,196 @@
+# =====================================================
+# LIGHTWEIGHT IN-PROCESS METRICS
+# named latency histograms and counters, shared by every
+# thread. Span names are "<stage>.<source>", e.g.
+# fetch.noaa, parse.dhan, aggregate, upstream.dhan.co.
+# Exported in Prometheus text format to a file
+# (USAWEATHER_METRICS_FILE) and/or an HTTP endpoint
+# (USAWEATHER_METRICS_PORT → :PORT/metrics).
+# =====================================================
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_FILE = os.environ.get("USAWEATHER_METRICS_FILE")
+METRICS_PORT = os.environ.get("USAWEATHER_METRICS_PORT")
+
+# seconds – upper bounds, Prometheus "le"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_timings = {}
+_counters = Counter()
+_collectors = []
+_server = None
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last one is +Inf
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-th observation
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+def record(name, seconds):
+    with _lock:
+        h = _timings.get(name)
+        if h is None:
+            h = _timings[name] = _Histogram()
+        h.observe(seconds)
+
+
+@contextmanager
+def span(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def incr(name, n=1):
+    with _lock:
+        _counters[name] += n
+
+
+def add_collector(fn):
+    """fn() → iterable of (metric_name, {label: value}, gauge value)"""
+    with _lock:
+        if fn not in _collectors:
+            _collectors.append(fn)
+
+
+def snapshot():
+    with _lock:
+        return {
+            "timings": {
+                k: {
+                    "count": h.count,
+                    "total_s": h.total,
+                    "max_s": h.max,
+                    "p50_s": h.quantile(0.5),
+                    "p95_s": h.quantile(0.95),
+                }
+                for k, h in _timings.items()
+            },
+            "counters": dict(_counters),
+        }
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+# -----------------------------------------------------
+# Prometheus export
+# -----------------------------------------------------
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus():
+    with _lock:
+        timings = {k: (h.count, h.total, list(h.buckets)) for k, h in _timings.items()}
+        counters = dict(_counters)
+        collectors = list(_collectors)
+
+    lines = [
+        "# HELP usaweather_span_seconds Time spent per pipeline stage / upstream.",
+        "# TYPE usaweather_span_seconds histogram",
+    ]
+    for name, (count, total, buckets) in sorted(timings.items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += n
+            lines.append(f'usaweather_span_seconds_bucket{{span="{_label(name)}",le="{bound}"}} {cumulative}')
+        lines.append(f'usaweather_span_seconds_sum{{span="{_label(name)}"}} {total:.6f}')
+        lines.append(f'usaweather_span_seconds_count{{span="{_label(name)}"}} {count}')
+
+    lines += [
+        "# HELP usaweather_events_total Upstream calls, cache hits/misses, retries.",
+        "# TYPE usaweather_events_total counter",
+    ]
+    for name, value in sorted(counters.items()):
+        lines.append(f'usaweather_events_total{{event="{_label(name)}"}} {value}')
+
+    gauges = {}
+    for fn in collectors:
+        try:
+            for metric, labels, value in fn():
+                gauges.setdefault(metric, []).append((labels, value))
+        except Exception:
+            continue
+    for metric, samples in sorted(gauges.items()):
+        lines.append(f"# TYPE {metric} gauge")
+        for labels, value in samples:
+            tags = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"{metric}{{{tags}}} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path=METRICS_FILE):
+    # node_exporter textfile collector: write-then-rename so scrapes never see half a file
+    if not path:
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(to_prometheus())
+    os.replace(tmp, path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = to_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port=METRICS_PORT):
+    """Start the /metrics endpoint once per process (no-op without a port)."""
+    global _server
+    if not port:
+        return None
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", int(port)), _Handler)
+            except OSError:
+                # another Streamlit process on this box already exports
+                return None
+            threading.Thread(target=_server.serve_forever, name="usaweather-metrics", daemon=True).start()
+    return _server
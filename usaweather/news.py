@@ -0,0 +1,167 @@
+# =====================================================
+# NATURAL GAS NEWS
+# several energy feeds polled concurrently with ETag /
+# If-Modified-Since; stories are deduplicated by a hash
+# of their headline, kept in a bounded rolling store and
+# scored for relevance at ingest; each poll re-ranks by
+# relevance decayed with age, so pages only read a
+# ready-ranked list that stays current
+# =====================================================
+import calendar
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+from usaweather import client, metrics
+
+NG_NEWS_URL = (
+    "https://news.google.com/rss/search?q=natural+gas+LNG+weather&hl=en-US&gl=US&ceid=US:en"
+)
+
+# comma-separated override: USAWEATHER_NEWS_FEEDS="url1,url2"
+NEWS_FEEDS = [
+    u.strip() for u in os.environ.get("USAWEATHER_NEWS_FEEDS", "").split(",") if u.strip()
+] or [
+    NG_NEWS_URL,
+    "https://news.google.com/rss/search?q=natural+gas+storage+EIA&hl=en-US&gl=US&ceid=US:en",
+    "https://www.eia.gov/rss/todayinenergy.xml",
+]
+
+MAX_STORIES = 500
+TOP_N = 5
+# rank = (1 + keyword score) halved every HALF_LIFE hours; stories older
+# than MAX_AGE only show when nothing newer is stored
+HALF_LIFE = 12   # hours
+MAX_AGE = 72     # hours
+
+# relevance weights, matched on the lower-cased headline + summary
+KEYWORDS = {
+    "LNG": (re.compile(r"\blng\b"), 2.0),
+    "storage": (re.compile(r"\bstorage\b|\binjection"), 2.0),
+    "freeze-off": (re.compile(r"\bfreeze[- ]?offs?\b"), 3.0),
+    "heat": (re.compile(r"\bheat(?:wave|ing)?\b|\bheat wave\b"), 1.5),
+}
+
+COLUMNS = ["Date", "Headline", "Source", "Score"]
+
+_lock = threading.Lock()
+_feeds = {}       # url → {"etag", "modified", "digest"}
+_stories = {}     # headline hash → story
+_ranked = pd.DataFrame(columns=COLUMNS)
+
+
+def story_key(title):
+    # Google News appends " - Publisher"; the same wire story shows up under several
+    base = title.rsplit(" - ", 1)[0] if " - " in title else title
+    return hashlib.sha1(re.sub(r"[^a-z0-9]+", " ", base.lower()).strip().encode()).hexdigest()
+
+
+def score(text):
+    text = text.lower()
+    return sum(weight for pattern, weight in KEYWORDS.values() if pattern.search(text))
+
+
+def _poll(url):
+    """returns parsed entries, or None when the feed is unchanged / unreachable"""
+    state = _feeds.get(url, {})
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("modified"):
+        headers["If-Modified-Since"] = state["modified"]
+
+    try:
+        with metrics.span("fetch.news"):
+            r = client.get(url, headers=headers, timeout=10)
+    except requests.RequestException:
+        metrics.incr("news.error")
+        return None
+    if r.status_code == 304:
+        metrics.incr("cache.news.revalidated")
+        return None
+    if r.status_code != 200:
+        metrics.incr("news.error")
+        return None
+
+    digest = hashlib.sha1(r.content).hexdigest()
+    _feeds[url] = {
+        "etag": r.headers.get("ETag"),
+        "modified": r.headers.get("Last-Modified"),
+        "digest": digest,
+    }
+    if digest == state.get("digest"):
+        # server ignores conditional requests but nothing changed
+        metrics.incr("cache.news.unchanged")
+        return None
+
+    import feedparser  # only the background poll needs it
+
+    with metrics.span("parse.news"):
+        feed = feedparser.parse(r.content)
+    source = feed.feed.get("title", url)
+    return [(e, source) for e in feed.entries]
+
+
+def _ingest(entries):
+    added = 0
+    for e, source in entries:
+        title = e.get("title", "").strip()
+        if not title:
+            continue
+        key = story_key(title)
+        if key in _stories:
+            continue
+        published = e.get("published_parsed") or e.get("updated_parsed")
+        _stories[key] = {
+            "Date": e.get("published", e.get("updated", ""))[:16],
+            "Headline": title,
+            "Source": e.get("source", {}).get("title", source),
+            "Score": score(title + " " + e.get("summary", "")),
+            # undated stories age from when we first saw them
+            "ts": calendar.timegm(published) if published else time.time(),
+        }
+        added += 1
+
+    if len(_stories) > MAX_STORIES:
+        # drop the oldest stories beyond the bound
+        for key in sorted(_stories, key=lambda k: _stories[k]["ts"])[:len(_stories) - MAX_STORIES]:
+            del _stories[key]
+    metrics.incr("news.stories.added", added)
+    return added
+
+
+def refresh(feeds=None):
+    """poll every feed once; returns the number of new stories"""
+    global _ranked
+    feeds = feeds or NEWS_FEEDS
+    with ThreadPoolExecutor(max_workers=len(feeds), thread_name_prefix="usaweather-news") as pool:
+        polled = list(pool.map(_poll, feeds))
+
+    with _lock:
+        added = sum(_ingest(entries) for entries in polled if entries)
+        # re-rank every poll: ages move even when no story is new
+        _ranked = rank(_stories.values(), time.time())
+    return added
+
+
+def rank(stories, now):
+    df = pd.DataFrame(list(stories), columns=COLUMNS + ["ts"])
+    if df.empty:
+        return df[COLUMNS]
+    age = (now - df["ts"]).clip(lower=0) / 3600
+    df["rank"] = (1 + df["Score"]) * 0.5 ** (age / HALF_LIFE)
+    recent = age <= MAX_AGE
+    if recent.any():
+        df = df[recent]
+    return df.sort_values(["rank", "ts"], ascending=False)[COLUMNS]
+
+
+def fetch_ng_news(top=TOP_N):
+    refresh()
+    return _ranked.head(top).reset_index(drop=True)
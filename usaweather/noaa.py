@@ -0,0 +1,55 @@
+# =====================================================
+# NOAA FETCH ENGINE (CONCURRENT, BOUNDED)
+# =====================================================
+from concurrent.futures import ThreadPoolExecutor
+
+from usaweather import forecast_cache, gridpoints
+
+# api.weather.gov asks clients to stay polite – never more than this many
+# requests in flight from one process
+MAX_WORKERS = 8
+
+# forecastHourly covers ~156 h; keep all of it (days 1–7), capped at a week
+HOURS = 7 * 24
+
+
+class Periods(list):
+    # plain list of hourly periods, tagged with the grid's NOAA updateTime
+    update_time = None
+
+
+def get_hourly(lat, lon):
+    try:
+        grid = gridpoints.resolve(lat, lon)
+        if grid is None:
+            return []
+        status, periods, update_time = forecast_cache.fetch(grid["forecastHourly"])
+
+        if status == 404:
+            # grid was re-assigned – look the point up again and retry once
+            grid = gridpoints.resolve(lat, lon, refresh=True)
+            if grid is None:
+                return []
+            status, periods, update_time = forecast_cache.fetch(grid["forecastHourly"])
+
+        out = Periods(periods[:HOURS])
+        out.update_time = update_time
+        return out
+    except Exception:
+        return []
+
+
+def fetch_all_hourly(states, max_workers=MAX_WORKERS):
+    """
+    states: {name: (city, lat, lon, population)}
+    returns {name: periods} in the same order, [] for failed lookups
+    """
+    names = list(states)
+    coords = [(states[n][1], states[n][2]) for n in names]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(names, pool.map(lambda c: get_hourly(*c), coords)))
+    finally:
+        # new /points lookups hit disk once per batch, not once each
+        gridpoints.flush()
@@ -0,0 +1,195 @@
+# =====================================================
+# BACKGROUND REFRESHER
+# one daemon thread per process refreshes forecasts,
+# prices and news on a fixed cadence and publishes an
+# immutable snapshot that page renders read instantly.
+# Each job's result is published the moment it lands,
+# so a slow source never holds back the others; a job
+# past its deadline keeps its last value until it
+# finishes.
+# =====================================================
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from types import MappingProxyType
+
+from usaweather import metrics
+
+REFRESH_INTERVAL = 300  # seconds
+MAX_JOBS = 32
+
+
+class Snapshot(namedtuple("Snapshot", "taken_at data updated")):
+    __slots__ = ()
+
+    @property
+    def age(self):
+        return time.time() - self.taken_at if self.taken_at else None
+
+    def age_of(self, name):
+        # seconds since `name` last produced a value (None: never)
+        at = self.updated.get(name)
+        return time.time() - at if at else None
+
+
+_EMPTY = MappingProxyType({})
+
+
+class Refresher:
+    def __init__(self, interval=REFRESH_INTERVAL):
+        self.interval = interval
+        self._jobs = {}
+        self._deadlines = {}
+        self._in_flight = {}
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._snapshot = Snapshot(0.0, _EMPTY, _EMPTY)
+        self._generation = 0
+        self._running = False
+        self._thread = None
+        self._pool = None
+
+    # -------------------------------------------------
+    # registration
+    # -------------------------------------------------
+    def register(self, name, fn, deadline=None):
+        """
+        pages re-register on every rerun; the newest callable wins.
+        deadline (s): how long a refresh pass waits for this job
+        """
+        with self._cond:
+            is_new = name not in self._jobs
+            self._jobs[name] = fn
+            self._deadlines[name] = deadline
+            if self._thread is None:
+                self._pool = ThreadPoolExecutor(max_workers=MAX_JOBS, thread_name_prefix="usaweather-job")
+                self._thread = threading.Thread(
+                    target=self._run, name="usaweather-refresher", daemon=True
+                )
+                self._thread.start()
+                metrics.serve()
+        if is_new:
+            self._wake.set()
+
+    # -------------------------------------------------
+    # reads
+    # -------------------------------------------------
+    def snapshot(self, *names, timeout=None):
+        """
+        latest published snapshot; blocks only until every name in
+        `names` has been fetched at least once (cold start)
+        """
+        with metrics.span("wait.snapshot"), self._cond:
+            self._cond.wait_for(
+                lambda: all(n in self._snapshot.data for n in names),
+                timeout=timeout
+            )
+            return self._snapshot
+
+    def latest(self):
+        """the published snapshot as it is now – never waits"""
+        return self._snapshot
+
+    def as_ready(self, names, timeout=None):
+        """
+        yields (name, snapshot) as each job has a value, in arrival order;
+        names still missing at the deadline are yielded as (name, None)
+        """
+        pending = list(names)
+        end = None if timeout is None else time.monotonic() + timeout
+        while pending:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: any(n in self._snapshot.data for n in pending),
+                    timeout=None if end is None else max(0.0, end - time.monotonic())
+                )
+                snap = self._snapshot
+            ready = [n for n in pending if n in snap.data]
+            if not ready:
+                for n in pending:
+                    yield n, None
+                return
+            for n in ready:
+                pending.remove(n)
+                yield n, snap
+
+    def refresh_now(self, timeout=None):
+        with self._cond:
+            if self._thread is None:
+                return self._snapshot
+            # a pass already in flight may predate the caller's request
+            target = self._generation + (2 if self._running else 1)
+        self._wake.set()
+        with self._cond:
+            self._cond.wait_for(lambda: self._generation >= target, timeout=timeout)
+            return self._snapshot
+
+    # -------------------------------------------------
+    # worker
+    # -------------------------------------------------
+    def _job(self, name, fn):
+        # publishes before the future resolves, so waiting on it is enough
+        try:
+            with metrics.span("job." + name):
+                value, ok = fn(), True
+        except Exception:
+            value, ok = None, False
+        self._publish(name, value, ok)
+
+    def _publish(self, name, value, ok):
+        with self._cond:
+            self._in_flight.pop(name, None)
+            data = dict(self._snapshot.data)
+            updated = dict(self._snapshot.updated)
+            if ok:
+                data[name] = value
+                updated[name] = time.time()
+            else:
+                # keep the last good value; None unblocks cold-start readers
+                data.setdefault(name, None)
+            self._snapshot = Snapshot(time.time(), MappingProxyType(data), MappingProxyType(updated))
+            self._cond.notify_all()
+
+        try:
+            metrics.write_textfile()
+        except OSError:
+            pass
+
+    def _run_once(self):
+        with self._cond:
+            self._running = True
+            jobs = dict(self._jobs)
+            deadlines = dict(self._deadlines)
+
+        started = time.monotonic()
+        futures = {}
+        for name, fn in jobs.items():
+            with self._cond:
+                if name in self._in_flight:
+                    # still running from a previous pass (missed its deadline)
+                    metrics.incr("refresher.skipped." + name)
+                    continue
+                futures[name] = self._in_flight[name] = self._pool.submit(self._job, name, fn)
+
+        # wait for deadline-less jobs fully, the rest only until their deadline
+        for name, fut in sorted(futures.items(), key=lambda kv: deadlines[kv[0]] is not None):
+            deadline = deadlines[name]
+            left = None if deadline is None else max(0.0, started + deadline - time.monotonic())
+            if not wait_futures([fut], timeout=left).done:
+                metrics.incr("refresher.deadline_missed." + name)
+
+        with self._cond:
+            self._generation += 1
+            self._running = False
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            self._run_once()
+            self._wake.wait(self.interval)
+
+
+REFRESHER = Refresher()
@@ -0,0 +1,145 @@
+# =====================================================
+# RECORD / REPLAY TRANSPORT
+# USAWEATHER_HTTP_MODE = live (default) | record | replay
+#   record – hit upstream, save every response as a
+#            gzipped fixture under USAWEATHER_FIXTURES
+#   replay – serve fixtures only, never touch the network,
+#            sleeping USAWEATHER_REPLAY_LATENCY s per call
+# HTTP goes through ReplayAdapter (mounted by client);
+# non-HTTP upstreams (tvDatafeed) go through call().
+# =====================================================
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from usaweather import metrics
+from usaweather.config import CACHE_DIR
+
+MODE = os.environ.get("USAWEATHER_HTTP_MODE", "live").lower()
+FIXTURE_DIR = os.environ.get("USAWEATHER_FIXTURES", os.path.join(CACHE_DIR, "fixtures"))
+LATENCY = float(os.environ.get("USAWEATHER_REPLAY_LATENCY", "0"))
+
+# already applied by urllib3 when recording; must not be replayed
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_lock = threading.Lock()
+
+
+class FixtureMissing(requests.RequestException):
+    # deliberately not a ConnectionError – nothing to gain by retrying
+    pass
+
+
+def _path(kind, key):
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(FIXTURE_DIR, kind, digest[:2], digest + (".json.gz" if kind == "http" else ".pkl.gz"))
+
+
+def _write(path, blob):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(gzip.compress(blob))
+    os.replace(tmp, path)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return gzip.decompress(f.read())
+
+
+def request_key(request):
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    return f"{request.method} {request.url} {hashlib.sha1(body).hexdigest()}"
+
+
+def _save(key, status, reason, headers, body):
+    _write(_path("http", key), json.dumps({
+        "key": key,
+        "status": status,
+        "reason": reason,
+        "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+        "body": body.decode("latin-1"),
+    }).encode())
+
+
+def save_response(method, url, body, status=200, headers=None, data=None):
+    """Write a fixture by hand (synthetic upstreams for benchmarks)."""
+    request = requests.Request(method, url, data=data).prepare()
+    _save(request_key(request), status, "OK", headers or {}, body)
+
+
+def save_call(key, result):
+    _write(_path("call", key), pickle.dumps(result))
+
+
+class ReplayAdapter(HTTPAdapter):
+    def __init__(self, mode=MODE, **kwargs):
+        self.mode = mode
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        key = request_key(request)
+        path = _path("http", key)
+
+        if self.mode == "replay":
+            if LATENCY:
+                time.sleep(LATENCY)
+            try:
+                fixture = json.loads(_read(path))
+            except FileNotFoundError:
+                raise FixtureMissing(f"no fixture for {key}", request=request)
+            return self._build(request, fixture)
+
+        r = super().send(request, **kwargs)
+        # a 304 only means "same as the fixture we already have"
+        if self.mode == "record" and r.status_code != 304:
+            _save(key, r.status_code, r.reason, r.headers, r.content)
+        return r
+
+    def _build(self, request, fixture):
+        r = requests.Response()
+        r.status_code = fixture["status"]
+        r.reason = fixture["reason"]
+        r.headers = CaseInsensitiveDict(fixture["headers"])
+        r._content = fixture["body"].encode("latin-1")
+        r.encoding = get_encoding_from_headers(r.headers)
+        r.url = request.url
+        r.request = request
+        r.connection = self
+        return r
+
+
+def call(key, fn):
+    """Record/replay a non-HTTP upstream call (result must pickle)."""
+    upstream = "upstream." + key.split(":")[0]
+    metrics.incr(upstream)
+    if MODE == "live":
+        with metrics.span(upstream):
+            return fn()
+
+    path = _path("call", key)
+    if MODE == "replay":
+        if LATENCY:
+            time.sleep(LATENCY)
+        try:
+            return pickle.loads(_read(path))
+        except FileNotFoundError:
+            raise LookupError(f"no fixture for {key}")
+
+    with metrics.span(upstream):
+        result = fn()
+    with _lock:
+        save_call(key, result)
+    return result
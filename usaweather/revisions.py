@@ -0,0 +1,119 @@
+# =====================================================
+# FORECAST REVISIONS (RUN-OVER-RUN)
+# aligns two DemandResults by (location, valid hour) and
+# diffs temperature, HDD / CDD and the weighted index –
+# pure NumPy on the cached matrices, no fetches
+# =====================================================
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+from usaweather import demand
+
+Revision = namedtuple("Revision", [
+    "names",              # current location order
+    "hours",              # common valid hours (epoch s)
+    "temp_delta",         # (loc × hour) °C, NaN where either run has no value
+    "hdd_delta",          # (loc × hour) degree-hours
+    "cdd_delta",          # (loc × hour) degree-hours
+    "location_temp",      # mean °C revision per location
+    "location_hdd",       # degree-day revision per location
+    "location_cdd",       # degree-day revision per location
+    "location_demand",    # HDD/CDD-weighted demand revision per location
+    "day_index_prev",     # previous run's index for the current run's days (NaN: not covered)
+    "day_index_delta",    # current − previous, per current day (NaN: not covered)
+    "day_demand_delta",   # weighted demand revision per current day
+    "now_index_delta",
+])
+
+
+def align(current, previous):
+    """
+    previous run's temps re-laid onto the current (location × hour) grid;
+    NaN wherever the previous run had no such location or hour
+    """
+    if current.names == previous.names:
+        rows = np.arange(len(current.names))
+    else:
+        pos = {n: i for i, n in enumerate(previous.names)}
+        rows = np.array([pos.get(n, -1) for n in current.names], dtype=np.int64)
+
+    _, cur_cols, prev_cols = np.intersect1d(
+        current.hours, previous.hours, assume_unique=True, return_indices=True
+    )
+
+    aligned = np.full(current.temps.shape, np.nan, dtype=np.float32)
+    have = rows >= 0
+    aligned[np.ix_(np.flatnonzero(have), cur_cols)] = previous.temps[np.ix_(rows[have], prev_cols)]
+    return aligned, cur_cols
+
+
+def diff(current, previous):
+    aligned, common = align(current, previous)
+    cur = current.temps[:, common]
+    prev = aligned[:, common]
+
+    temp_delta = cur - prev
+    hdd_delta = demand.hdd(cur) - demand.hdd(prev)
+    cdd_delta = demand.cdd(cur) - demand.cdd(prev)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # locations with no overlap
+        location_temp = np.nanmean(temp_delta, axis=1)
+    location_hdd = np.nansum(hdd_delta, axis=1) / demand.DAY_HOURS
+    location_cdd = np.nansum(cdd_delta, axis=1) / demand.DAY_HOURS
+
+    # previous run's index over the current run's day windows – a location
+    # the previous run had no data for that day carries no weight, as it
+    # carried none in the index that run published
+    population = current.population
+    prev_day_temp = demand.daily_mean(aligned)
+    day_weights = np.where(np.isnan(prev_day_temp), 0.0, population[:, None])
+    totals = day_weights.sum(axis=0)
+    weighted = np.nansum(demand.gas_score(prev_day_temp) * day_weights, axis=0)
+    day_index_prev = np.where(
+        totals > 0,
+        np.floor(np.minimum(100, weighted / np.where(totals > 0, totals, 1) * demand.INDEX_SCALE)),
+        np.nan,
+    )
+
+    # demand revision only where both runs cover the hour
+    both = ~np.isnan(current.temps) & ~np.isnan(aligned)
+    hourly_delta = np.where(
+        both, (demand.ng_demand(current.temps) - demand.ng_demand(aligned)) * population[:, None], 0.0
+    ).sum(axis=0)
+    n_days = len(current.day_index)
+    padded = np.zeros(n_days * demand.DAY_HOURS)
+    padded[:len(hourly_delta)] = hourly_delta
+
+    prev_now = demand.weighted_index(demand.gas_score(previous.now_temp), previous.population)
+
+    return Revision(
+        names=current.names,
+        hours=current.hours[common],
+        temp_delta=temp_delta,
+        hdd_delta=hdd_delta,
+        cdd_delta=cdd_delta,
+        location_temp=location_temp,
+        location_hdd=location_hdd,
+        location_cdd=location_cdd,
+        location_demand=location_hdd * demand.HDD_WEIGHT + location_cdd * demand.CDD_WEIGHT,
+        day_index_prev=day_index_prev,
+        day_index_delta=current.day_index - day_index_prev,
+        day_demand_delta=padded.reshape(n_days, demand.DAY_HOURS).sum(axis=1),
+        now_index_delta=current.now_index - int(prev_now),
+    )
+
+
+def movers(rev, top=10):
+    import pandas as pd
+
+    order = np.argsort(-np.abs(np.nan_to_num(rev.location_demand)), kind="stable")[:top]
+    return pd.DataFrame({
+        "Location": np.asarray(rev.names)[order],
+        "Temp Rev (°C)": rev.location_temp[order].astype(np.float64).round(2),
+        "HDD Rev (°C·day)": rev.location_hdd[order].astype(np.float64).round(2),
+        "CDD Rev (°C·day)": rev.location_cdd[order].astype(np.float64).round(2),
+        "Demand Rev": rev.location_demand[order].astype(np.float64).round(2),
+    })
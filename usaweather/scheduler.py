@@ -0,0 +1,161 @@
+# =====================================================
+# RATE-LIMIT-AWARE REQUEST SCHEDULER
+# token bucket + per-host concurrency cap over the pooled
+# client (timeouts live there), jittered exponential
+# backoff on 429 / 5xx with Retry-After honoured up to
+# BACKOFF_CAP. Non-idempotent requests (Telegram POSTs)
+# are only retried when the server cannot have acted.
+# All NOAA and Telegram traffic goes through SCHEDULER.
+# =====================================================
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+from usaweather import client, metrics, replay
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5   # seconds
+BACKOFF_CAP = 30.0   # also the longest Retry-After we wait out
+IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# host → (requests per second, burst, max in flight)
+HOST_LIMITS = {
+    "api.weather.gov": (10.0, 10, 8),
+    "api.telegram.org": (30.0, 30, 4),
+}
+DEFAULT_LIMIT = (5.0, 5, 4)
+# as configured for live traffic – benchmarks project replayed runs onto these
+LIVE_HOST_LIMITS = dict(HOST_LIMITS)
+
+if replay.MODE == "replay":
+    # fixtures need no protecting – keep only the concurrency caps
+    HOST_LIMITS = {h: (float("inf"), b, n) for h, (_, b, n) in HOST_LIMITS.items()}
+    DEFAULT_LIMIT = (float("inf"),) + DEFAULT_LIMIT[1:]
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        # server told us to back off – nobody on this host goes before then
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                    self._stamp = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def retry_after(headers):
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt):
+    # "full jitter" – spreads retries from parallel workers apart
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class Scheduler:
+    def __init__(self, host_limits=None):
+        self.host_limits = dict(HOST_LIMITS, **(host_limits or {}))
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                rate, burst, in_flight = self.host_limits.get(host, DEFAULT_LIMIT)
+                self._hosts[host] = (TokenBucket(rate, burst), threading.BoundedSemaphore(in_flight))
+            return self._hosts[host]
+
+    def _count(self, key):
+        with self._lock:
+            self._counters[key] += 1
+        metrics.incr("scheduler." + key)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def request(self, method, url, **kwargs):
+        bucket, slots = self._host(urlsplit(url).netloc)
+        # a POST that timed out or got a 5xx may have been applied –
+        # retrying it could e.g. send the same Telegram message twice
+        idempotent = method.upper() in IDEMPOTENT
+
+        for attempt in range(MAX_RETRIES + 1):
+            bucket.acquire()
+            self._count("requests")
+            try:
+                with slots:
+                    r = client.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._count("errors")
+                if attempt == MAX_RETRIES or not (idempotent or isinstance(e, requests.ConnectTimeout)):
+                    raise
+                self._count("retries")
+                time.sleep(backoff(attempt))
+                continue
+
+            if r.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return r
+            if not idempotent and r.status_code != 429:
+                return r
+
+            delay = retry_after(r.headers)
+            if delay is not None and delay > BACKOFF_CAP:
+                # asked to wait longer than we are willing to block a caller
+                self._count("gave_up")
+                bucket.pause(BACKOFF_CAP)
+                return r
+
+            self._count("retries")
+            delay = delay if delay is not None else backoff(attempt)
+            if r.status_code == 429:
+                self._count("throttled")
+                bucket.pause(delay)
+            else:
+                self._count("server_errors")
+            time.sleep(delay)
+
+        return r
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+SCHEDULER = Scheduler()
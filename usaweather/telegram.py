@@ -0,0 +1,144 @@
+# =====================================================
+# TELEGRAM ALERT DISPATCHER
+# pages enqueue and return immediately; one background
+# sender per bot drains the queue, batches pending alerts
+# into one message per chat and paces itself to Telegram's
+# limits (~30 msg/s per bot via the scheduler, 1 msg/s per
+# chat). Alerts carrying a dedupe key go out once – across
+# sessions, reruns, restarts and processes
+# (CACHE_DIR/telegram_sent.json, flock-guarded).
+# =====================================================
+import json
+import os
+import queue
+import threading
+import time
+
+import requests
+
+from usaweather import metrics
+from usaweather.config import CACHE_DIR
+from usaweather.scheduler import SCHEDULER, TokenBucket
+
+try:
+    import fcntl
+except ImportError:  # Windows: process-local only
+    fcntl = None
+
+SENT_FILE = os.path.join(CACHE_DIR, "telegram_sent.json")
+SENT_KEEP = 14 * 24 * 3600   # forget dedupe keys after two weeks
+MAX_TEXT = 4096              # Telegram message limit
+PER_CHAT_RATE = 1.0          # messages / second / chat
+INDEX_BUCKET = 5             # index points per dedupe bucket
+
+_lock = threading.Lock()
+_dispatchers = {}
+
+
+# -----------------------------------------------------
+# dedupe (shared by every dispatcher in the process)
+# -----------------------------------------------------
+def alert_key(kind, date, index):
+    """(alert type, date, index bucket) – 67 and 69 are the same alert"""
+    return f"{kind}|{date}|{int(index) // INDEX_BUCKET * INDEX_BUCKET}"
+
+
+def _claim(key):
+    # True the first time `key` is seen by any process; persisted before
+    # anything is sent. Read-modify-write under flock, as in alerts.py
+    with _lock:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            f = open(SENT_FILE, "a+", encoding="utf-8")
+        except OSError:
+            return True  # no shared state – better a duplicate than a lost alert
+        with f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                sent = json.loads(f.read() or "{}")
+            except ValueError:
+                sent = {}
+            if key in sent:
+                return False
+            now = time.time()
+            sent = {k: at for k, at in sent.items() if now - at <= SENT_KEEP}
+            sent[key] = now
+            f.seek(0)
+            f.truncate()
+            json.dump(sent, f)
+            f.flush()
+        return True
+
+
+# -----------------------------------------------------
+# dispatcher
+# -----------------------------------------------------
+class Dispatcher:
+    def __init__(self, token, chat_ids):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.chat_ids = list(chat_ids)
+        self._queue = queue.Queue()
+        self._chats = {}
+        self._thread = threading.Thread(target=self._run, name="usaweather-telegram", daemon=True)
+        self._thread.start()
+
+    def send(self, message, dedupe_key=None):
+        """never blocks; False when `dedupe_key` has already been sent"""
+        if dedupe_key is not None and not _claim(dedupe_key):
+            metrics.incr("telegram.deduped")
+            return False
+        self._queue.put(message)
+        metrics.incr("telegram.queued")
+        return True
+
+    def _bucket(self, chat_id):
+        if chat_id not in self._chats:
+            self._chats[chat_id] = TokenBucket(PER_CHAT_RATE, 1)
+        return self._chats[chat_id]
+
+    def _batches(self, first):
+        # everything queued meanwhile rides along, split at Telegram's limit
+        batch = first
+        while True:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if len(batch) + 2 + len(message) > MAX_TEXT:
+                yield batch
+                batch = message
+            else:
+                batch += "\n\n" + message
+        yield batch
+
+    def _post(self, chat_id, text):
+        self._bucket(chat_id).acquire()
+        try:
+            with metrics.span("fetch.telegram"):
+                r = SCHEDULER.request("POST", self.url, data={"chat_id": chat_id, "text": text})
+            metrics.incr("telegram.sent" if r.ok else "telegram.failed")
+        except requests.RequestException:
+            metrics.incr("telegram.failed")
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            for text in self._batches(first):
+                for chat_id in self.chat_ids:
+                    self._post(chat_id, text)
+
+    def pending(self):
+        return self._queue.qsize()
+
+
+def dispatcher(token, chat_ids):
+    """process-wide dispatcher per bot token"""
+    with _lock:
+        d = _dispatchers.get(token)
+        if d is None:
+            d = _dispatchers[token] = Dispatcher(token, chat_ids)
+        else:
+            d.chat_ids = list(chat_ids)
+        return d
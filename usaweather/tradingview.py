@@ -0,0 +1,156 @@
+# =====================================================
+# TRADINGVIEW CLIENT + INCREMENTAL BAR CACHE
+# one logged-in TvDatafeed per account per process, and
+# a bar store per (symbol, exchange, interval) that only
+# asks TradingView for bars newer than the last one held
+# (persisted under CACHE_DIR/bars so restarts stay cheap)
+# =====================================================
+import os
+import pickle
+import threading
+import time
+
+from usaweather import metrics, replay
+from usaweather.config import CACHE_DIR
+
+BARS_DIR = os.path.join(CACHE_DIR, "bars")
+MAX_BARS = 5000
+# bars are re-checked at most this often; a check asks only for
+# the last held bar plus whatever has opened since
+LIVE_TTL = 300  # seconds
+
+# tvDatafeed Interval values → bar length in seconds
+INTERVAL_SECONDS = {
+    "1": 60, "3": 180, "5": 300, "15": 900, "30": 1800, "45": 2700,
+    "1H": 3600, "2H": 7200, "3H": 10800, "4H": 14400,
+    "1D": 86400, "1W": 7 * 86400, "1M": 31 * 86400,
+}
+
+_lock = threading.Lock()
+_clients = {}
+_stores = {}
+
+
+# -----------------------------------------------------
+# client
+# -----------------------------------------------------
+def client(username=None, password=None):
+    """process-wide TvDatafeed – logs in once, not on every rerun"""
+    with _lock:
+        if username not in _clients:
+            from tvDatafeed import TvDatafeed
+
+            tv = TvDatafeed(username, password) if username else TvDatafeed()
+            _clients[username] = (tv, threading.Lock())
+        return _clients[username][0]
+
+
+def _client_lock(tv):
+    with _lock:
+        for c, lock in _clients.values():
+            if c is tv:
+                return lock
+        # a caller-built client: give it its own lock
+        _clients[("adhoc", id(tv))] = (tv, threading.Lock())
+        return _clients[("adhoc", id(tv))][1]
+
+
+# -----------------------------------------------------
+# bar store
+# -----------------------------------------------------
+class BarStore:
+    def __init__(self, symbol, exchange, interval):
+        self.symbol = symbol
+        self.exchange = exchange
+        self.interval = interval
+        self.step = INTERVAL_SECONDS.get(str(getattr(interval, "value", interval)), 86400)
+        self.key = f"tv:{symbol}:{exchange}:{getattr(interval, 'value', interval)}"
+        self.path = os.path.join(BARS_DIR, self.key.replace(":", "_")[3:] + ".pkl")
+        self.bars = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                self.bars = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.bars = None
+
+    def _save(self):
+        try:
+            os.makedirs(BARS_DIR, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(self.bars, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def _fetch(self, tv, n_bars):
+        metrics.incr("cache.bars.fetched", n_bars)
+        with _client_lock(tv):
+            try:
+                return replay.call(f"{self.key}:{n_bars}", lambda: tv.get_hist(
+                    symbol=self.symbol,
+                    exchange=self.exchange,
+                    interval=self.interval,
+                    n_bars=n_bars
+                ))
+            except LookupError:
+                # replay without a fixture for this slice – keep what we hold
+                return None
+
+    def _missing(self, now):
+        if self.bars is None or self.bars.empty:
+            return None
+        if now - self.checked_at < LIVE_TTL:
+            # checked recently: either nothing has closed since, or the
+            # market is shut and asking again would return the same bars
+            return 0
+        last = self.bars.index[-1].timestamp()
+        # re-read the last (possibly forming) bar plus everything after it
+        return int((now - last) // self.step) + 1
+
+    def get(self, tv, n_bars):
+        import pandas as pd
+
+        with self.lock:
+            now = time.time()
+            missing = self._missing(now)
+
+            if missing is None or len(self.bars) < n_bars:
+                df = self._fetch(tv, n_bars)
+                if df is not None and not df.empty:
+                    self.bars = df if self.bars is None else _merge(self.bars, df, pd)
+                    self.checked_at = now
+                    self._save()
+            elif missing:
+                df = self._fetch(tv, missing)
+                if df is not None and not df.empty:
+                    self.bars = _merge(self.bars, df, pd)
+                    self._save()
+                self.checked_at = now
+            else:
+                metrics.incr("cache.bars.hit")
+
+            return None if self.bars is None else self.bars.tail(n_bars)
+
+
+def _merge(held, fresh, pd):
+    # newer rows win for overlapping timestamps
+    merged = pd.concat([held[~held.index.isin(fresh.index)], fresh]).sort_index()
+    return merged.tail(MAX_BARS)
+
+
+def store(symbol, exchange, interval):
+    key = (symbol, exchange, str(getattr(interval, "value", interval)))
+    with _lock:
+        if key not in _stores:
+            _stores[key] = BarStore(symbol, exchange, interval)
+        return _stores[key]
+
+
+def bars(tv, symbol, exchange, interval, n_bars):
+    return store(symbol, exchange, interval).get(tv, n_bars)